@@ -0,0 +1,287 @@
+"""
+Admission Control - decides whether a request may run before any work is done
+for it: token buckets per client and per intent, and a bounded number of
+requests running and waiting in each worker, beyond which requests are shed
+with a Retry-After hint instead of piling up.
+
+Token buckets live in process memory by default; with the Redis limiter they
+are shared, so limits hold across every worker and server. Concurrency is
+always per worker, because it protects that worker's own threads.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from optional_deps import require
+
+logger = logging.getLogger(__name__)
+
+
+class Rejected(Exception):
+    """A request that must not run; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status, reason, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def parse_limit(value):
+    """Parse 'rate' or 'rate:burst' (requests per second); burst defaults to twice the rate"""
+    rate, _, burst = str(value).partition(':')
+    rate = float(rate)
+    return rate, float(burst) if burst else max(1.0, rate * 2)
+
+
+def parse_intent_limits(value):
+    """Parse 'intent=rate:burst,...' into {intent: (rate, burst)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        intent, _, limit = item.partition('=')
+        limits[intent.strip()] = parse_limit(limit)
+    return limits
+
+
+class MemoryRateLimiter:
+    """Token buckets in this process, the least recently used dropped beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key, rate, burst, cost=1):
+        """Take cost tokens from a bucket; returns 0 if allowed, else seconds until it would be"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens = min(burst, tokens - cost)
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # A bucket idle long enough to be evicted would have refilled anyway
+                self._buckets.popitem(last=False)
+            return wait
+
+    def refund(self, key, rate, burst, cost=1):
+        """Give back tokens taken for a request that was rejected by a later bucket"""
+        self.acquire(key, rate, burst, -cost)
+
+
+# Refill and take tokens atomically on the server, using its clock for every worker
+_TOKEN_BUCKET_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = math.min(burst, tokens - cost)
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets shared by every worker through Redis (or a server speaking its protocol)"""
+
+    def __init__(self, url, prefix='chatbot:ratelimit:'):
+        redis = require('redis', "The Redis rate limiter")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self.prefix = prefix
+        self._script = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+        self.errors = 0
+
+    def acquire(self, key, rate, burst, cost=1):
+        try:
+            return float(self._script(keys=[self.prefix + key], args=[rate, burst, cost]))
+        except Exception:
+            # Fail open: an unreachable limiter must not take the chatbot down
+            self.errors += 1
+            logger.warning("Rate limiter unavailable, admitting request", exc_info=True)
+            return 0.0
+
+    def refund(self, key, rate, burst, cost=1):
+        """Give back tokens taken for a request that was rejected by a later bucket"""
+        self.acquire(key, rate, burst, -cost)
+
+
+class ConcurrencyLimiter:
+    """At most max_active requests run at once; up to max_queued wait for queue_timeout"""
+
+    def __init__(self, max_active, max_queued=0, queue_timeout=1.0):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Take a slot, returning True if it had to wait; raises Rejected when the queue is full or the wait runs out"""
+        with self._condition:
+            if self.active < self.max_active:
+                self.active += 1
+                return False
+            if self.waiting >= self.max_queued:
+                raise Rejected(503, 'queue_full', self.queue_timeout, "The server is busy, please retry shortly")
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self.active >= self.max_active:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Rejected(503, 'queue_timeout', self.queue_timeout, "The server is busy, please retry shortly")
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class AdmissionController:
+    def __init__(self, rate_limiter=None, client_limit=None, intent_limits=None, concurrency=None):
+        self.rate_limiter = rate_limiter or MemoryRateLimiter()
+        self.client_limit = client_limit
+        self.intent_limits = intent_limits or {}
+        self.concurrency = concurrency
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {'client_rate': 0, 'intent_rate': 0, 'queue_full': 0, 'queue_timeout': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.client_limit or self.intent_limits or self.concurrency)
+
+    def record_rejection(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def check_rates(self, client, intents=(), cost=1):
+        """Charge the client's bucket and each intent's bucket, raising Rejected (429) when one is empty.
+
+        A rejected request is charged nothing: tokens already taken from the other
+        buckets are refunded, so retries of a throttled intent don't drain the client.
+        Returns the charges made, for refund() should the request be shed later.
+        """
+        charged = []
+        try:
+            if self.client_limit:
+                rate, burst = self.client_limit
+                # A batch larger than the burst could otherwise never be admitted
+                charge = (f"client:{client}", rate, burst, min(cost, burst))
+                wait = self.rate_limiter.acquire(*charge)
+                if wait:
+                    self.record_rejection('client_rate')
+                    raise Rejected(429, 'client_rate', wait, "Too many requests, please slow down")
+                charged.append(charge)
+            for intent in intents:
+                limit = self.intent_limits.get(intent)
+                if limit is None:
+                    continue
+                charge = (f"intent:{intent}", *limit, 1)
+                wait = self.rate_limiter.acquire(*charge)
+                if wait:
+                    self.record_rejection('intent_rate')
+                    raise Rejected(429, 'intent_rate', wait, f"Too many '{intent}' requests right now, please retry shortly")
+                charged.append(charge)
+        except Rejected:
+            self.refund(charged)
+            raise
+        return charged
+
+    def refund(self, charged):
+        """Give back the tokens check_rates took"""
+        for charge in charged:
+            self.rate_limiter.refund(*charge)
+
+    def admit(self, client, intents=(), cost=1):
+        """check_rates, then enter(); a request shed for concurrency gets its tokens back"""
+        charged = self.check_rates(client, intents, cost)
+        try:
+            self.enter()
+        except Rejected:
+            self.refund(charged)
+            raise
+
+    def enter(self):
+        """Take a concurrency slot if there is a limit, and count the request as admitted; pair every successful call with leave()"""
+        queued = False
+        if self.concurrency is not None:
+            try:
+                queued = self.concurrency.acquire()
+            except Rejected as rejection:
+                self.record_rejection(rejection.reason)
+                raise
+        self.record_admission(queued)
+
+    def record_admission(self, queued=False):
+        with self._lock:
+            self.admitted += 1
+            self.queued += queued
+
+    def leave(self):
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': dict(self.rejected),
+                'client_limit': self.client_limit,
+                'intent_limits': self.intent_limits
+            }
+        if self.concurrency is not None:
+            stats.update(active=self.concurrency.active, waiting=self.concurrency.waiting,
+                         max_active=self.concurrency.max_active, max_queued=self.concurrency.max_queued)
+        return stats
+
+
+def admission_from_env():
+    """Build the admission controller from RATE_LIMIT_* and ADMISSION_* settings; all limits are off by default"""
+    client_limit = os.getenv('RATE_LIMIT_PER_CLIENT', '0')
+    client_limit = parse_limit(client_limit) if float(client_limit.partition(':')[0]) > 0 else None
+
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+    if backend == 'memory':
+        rate_limiter = MemoryRateLimiter()
+    elif backend == 'redis':
+        rate_limiter = RedisRateLimiter(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}' (expected memory or redis)")
+
+    max_active = int(os.getenv('ADMISSION_MAX_ACTIVE', '0'))
+    concurrency = ConcurrencyLimiter(
+        max_active,
+        max_queued=int(os.getenv('ADMISSION_MAX_QUEUED', str(max_active * 2))),
+        queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '1'))
+    ) if max_active > 0 else None
+
+    return AdmissionController(rate_limiter, client_limit,
+                               parse_intent_limits(os.getenv('RATE_LIMIT_INTENTS')), concurrency)
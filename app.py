@@ -1,289 +1,306 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context, send_from_directory, abort, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import json
-import random
 import re
+import secrets
+import time
 from datetime import datetime
-import openai
+from functools import lru_cache, partial
 from dotenv import load_dotenv
+from catalog import CatalogSource, DEFAULT_CATALOG_PATH
+from chatbot import SmallBusinessChatbot
+from semantic_categorizer import categorizer_from_env
+from response_cache import ResponseCache, normalize_idea
+from generation_backend import backend_from_env
+from logo_renderer import LogoRenderer, RenderQueueFull
+from metrics import Metrics, SlowRequestProfiler
+from session_store import session_store_from_env, new_session, new_session_id, is_valid_session_id
+from admission import admission_from_env, Rejected
+from seeds import new_seed, parse_seed, derive_seed, rng_for
+from bundle import BundleSource, DEFAULT_BUNDLE_PATH
+from response_encoding import ResponseEncoder, OrjsonProvider
+from optional_deps import is_available
 
 load_dotenv()
 
 app = Flask(__name__)
-CORS(app)
-
-# Initialize OpenAI (you'll need to set your API key)
-openai.api_key = os.getenv('OPENAI_API_KEY')
-
-class SmallBusinessChatbot:
-    def __init__(self):
-        self.business_steps = {
-            "restaurant": [
-                "1. Conduct market research and identify your target audience",
-                "2. Create a detailed business plan with financial projections",
-                "3. Secure funding through loans, investors, or personal savings",
-                "4. Choose and lease a suitable location with foot traffic",
-                "5. Obtain necessary licenses (business license, food service permit, liquor license if needed)",
-                "6. Design your menu and pricing strategy",
-                "7. Purchase equipment and furniture",
-                "8. Hire and train staff",
-                "9. Develop marketing strategies and brand identity",
-                "10. Plan your grand opening event"
-            ],
-            "retail": [
-                "1. Research your market and competition thoroughly",
-                "2. Define your unique selling proposition",
-                "3. Create a comprehensive business plan",
-                "4. Secure initial funding and working capital",
-                "5. Find the right location or set up e-commerce platform",
-                "6. Register your business and obtain necessary permits",
-                "7. Set up supplier relationships and inventory management",
-                "8. Design your store layout and customer experience",
-                "9. Hire and train employees",
-                "10. Launch marketing campaigns and build customer base"
-            ],
-            "service": [
-                "1. Define your service offerings and target market",
-                "2. Analyze competitors and pricing strategies",
-                "3. Create a detailed business plan",
-                "4. Set up business structure and legal requirements",
-                "5. Obtain necessary certifications and licenses",
-                "6. Set up your workspace (home office or commercial space)",
-                "7. Develop service packages and pricing",
-                "8. Create marketing materials and online presence",
-                "9. Build a network and referral system",
-                "10. Launch and continuously improve your services"
-            ],
-            "tech": [
-                "1. Validate your idea through market research and MVP testing",
-                "2. Create a detailed technical and business plan",
-                "3. Secure funding (bootstrapping, angel investors, or VCs)",
-                "4. Build your development team",
-                "5. Develop your minimum viable product (MVP)",
-                "6. Set up legal structure and intellectual property protection",
-                "7. Test and iterate based on user feedback",
-                "8. Plan your go-to-market strategy",
-                "9. Scale your product and team",
-                "10. Focus on customer acquisition and retention"
-            ]
-        }
-        
-        self.name_prefixes = [
-            "Smart", "Quick", "Pro", "Elite", "Prime", "Fresh", "Bright", "Swift", 
-            "Bold", "Zen", "Peak", "Pure", "Edge", "Spark", "Nova", "Ace"
-        ]
-        
-        self.name_suffixes = [
-            "Hub", "Lab", "Works", "Studio", "Co", "Plus", "Pro", "Express",
-            "Central", "Point", "Zone", "Spot", "Base", "House", "Corner"
-        ]
-        
-        self.funny_adjectives = [
-            "Quirky", "Witty", "Snappy", "Peppy", "Zesty", "Bubbly", "Spunky",
-            "Cheeky", "Jolly", "Funky", "Zippy", "Bouncy", "Perky", "Sassy"
-        ]
+CORS(app, origins=os.getenv('CORS_ORIGINS', '*').split(','), expose_headers=['X-Session-Id'])
 
-    def generate_business_steps(self, business_type, business_idea):
-        """Generate customized business steps based on the business idea"""
-        business_category = self.categorize_business(business_idea.lower())
-        base_steps = self.business_steps.get(business_category, self.business_steps["service"])
-        
-        # Customize steps based on specific business idea
-        customized_steps = []
-        for step in base_steps:
-            if "restaurant" in business_idea.lower() and "menu" not in step:
-                if "marketing" in step.lower():
-                    customized_steps.append(step + " (focus on food photography and reviews)")
-                else:
-                    customized_steps.append(step)
-            elif "online" in business_idea.lower() or "e-commerce" in business_idea.lower():
-                if "location" in step.lower():
-                    customized_steps.append(step.replace("location", "e-commerce platform and website"))
-                else:
-                    customized_steps.append(step)
-            else:
-                customized_steps.append(step)
-        
-        return customized_steps
-
-    def categorize_business(self, business_idea):
-        """Categorize business idea into predefined categories"""
-        if any(word in business_idea for word in ["restaurant", "cafe", "food", "bakery", "bar"]):
-            return "restaurant"
-        elif any(word in business_idea for word in ["retail", "store", "shop", "boutique", "selling"]):
-            return "retail"
-        elif any(word in business_idea for word in ["app", "software", "tech", "website", "platform"]):
-            return "tech"
-        else:
-            return "service"
+# orjson serializes responses several times faster when it is installed
+JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto').lower()
+if JSON_ENCODER == 'orjson' or (JSON_ENCODER == 'auto' and is_available('orjson')):
+    app.json = OrjsonProvider(app)
 
-    def generate_business_names(self, business_idea, count=5):
-        """Generate creative and humorous business names"""
-        names = []
-        business_words = business_idea.replace(" ", "").title()
-        
-        # Extract key words from business idea
-        key_words = [word.title() for word in business_idea.split() if len(word) > 3]
-        
-        for _ in range(count):
-            if random.choice([True, False]):
-                # Funny combination
-                name = f"{random.choice(self.funny_adjectives)} {random.choice(key_words)} {random.choice(self.name_suffixes)}"
-            else:
-                # Professional combination
-                name = f"{random.choice(self.name_prefixes)} {random.choice(key_words)} {random.choice(self.name_suffixes)}"
-            
-            names.append(name)
-        
-        # Add some creative combinations
-        if key_words:
-            names.append(f"The {key_words[0]} Collective")
-            names.append(f"{key_words[0]}ify" if len(key_words[0]) > 4 else f"{key_words[0]} & Co")
-        
-        return list(set(names))  # Remove duplicates
+# Behind a reverse proxy, take the client address from its X-Forwarded-For header
+if int(os.getenv('TRUSTED_PROXY_COUNT', '0')):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('TRUSTED_PROXY_COUNT')))
 
-    def generate_logo_prompt(self, business_name, business_idea):
-        """Generate a detailed prompt for logo creation"""
-        business_category = self.categorize_business(business_idea.lower())
-        
-        style_suggestions = {
-            "restaurant": "warm colors, food-related icons, elegant typography",
-            "retail": "modern, clean design, shopping-related elements",
-            "tech": "sleek, minimalist, digital-friendly colors like blue or green",
-            "service": "professional, trustworthy, clean lines"
-        }
-        
-        style = style_suggestions.get(business_category, "professional and modern")
-        
-        return f"Create a professional logo for '{business_name}', a {business_idea} business. Style: {style}. The logo should be memorable, scalable, and work well in both color and black & white."
-
-    def generate_social_media_content(self, platform, business_name, business_idea):
-        """Generate social media content for different platforms"""
-        content = {
-            "linkedin": {
-                "format": "Professional LinkedIn Post",
-                "content": f"🚀 Excited to introduce {business_name}! \n\nWe're revolutionizing {business_idea} with innovative solutions that put our customers first. Our mission is to deliver exceptional value while building lasting relationships in our community.\n\n✨ What sets us apart:\n• Customer-centric approach\n• Quality-driven solutions\n• Community-focused values\n• Innovation at our core\n\nReady to experience the difference? Let's connect and explore how we can serve you better!\n\n#SmallBusiness #Innovation #CustomerFirst #CommunityBusiness #Entrepreneurship"
-            },
-            "instagram": {
-                "format": "Instagram Post with Hashtags",
-                "content": f"✨ Meet {business_name}! ✨\n\nYour new go-to for {business_idea} 🎯\n\nWe believe in:\n🌟 Quality over quantity\n💫 Customer happiness\n🚀 Innovation that matters\n💝 Community love\n\nReady to join our journey? \nDM us or visit our link in bio! 👆\n\n#SmallBusiness #{business_name.replace(' ', '')} #Local #Quality #Innovation #CustomerLove #NewBusiness #Entrepreneur #Community #Excellence #Service"
-            },
-            "facebook": {
-                "format": "Facebook Ad Copy",
-                "content": f"🎉 Welcome to {business_name}! 🎉\n\nLooking for exceptional {business_idea}? You've found the right place!\n\nWhy choose us?\n✅ Personalized service\n✅ Competitive pricing\n✅ Local expertise\n✅ Customer satisfaction guaranteed\n\n🎁 SPECIAL LAUNCH OFFER: Contact us this month for exclusive deals!\n\n📞 Get in touch today and discover the {business_name} difference!\n\n#LocalBusiness #QualityService #SpecialOffer #CustomerFirst"
-            }
-        }
-        
-        return content.get(platform.lower(), {"format": "General Social Media", "content": f"Check out {business_name} for amazing {business_idea}!"})
-
-    def generate_innovative_ideas(self, business_idea):
-        """Generate innovative ideas related to the business"""
-        base_ideas = [
-            "Implement a customer loyalty program with gamification elements",
-            "Create a mobile app for easier customer interaction",
-            "Partner with complementary local businesses for cross-promotion",
-            "Offer subscription-based services for regular customers",
-            "Use social media for behind-the-scenes content and customer stories",
-            "Implement eco-friendly practices and market them as a unique selling point",
-            "Create educational content related to your industry",
-            "Offer virtual consultations or services",
-            "Develop a referral program with attractive incentives",
-            "Use data analytics to personalize customer experiences"
+# Templates come from the catalog file, re-read by each worker when it changes
+catalog_source = CatalogSource(
+    path=os.getenv('CATALOG_PATH', DEFAULT_CATALOG_PATH),
+    check_interval=float(os.getenv('CATALOG_RELOAD_INTERVAL', '2'))
+)
+chatbot = SmallBusinessChatbot(catalog_source, backend=backend_from_env(),
+                               categorizer=categorizer_from_env(catalog_source))
+
+# Serialized responses of the deterministic generators, keyed on the normalized idea
+response_cache = ResponseCache(
+    capacity=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+)
+
+# Replies for popular ideas precomputed by `python3 bundle.py export`, looked up
+# in a memory-mapped file before anything is generated; an empty path disables it
+bundle_source = BundleSource(
+    path=os.getenv('STATIC_BUNDLE_PATH', DEFAULT_BUNDLE_PATH),
+    check_interval=float(os.getenv('STATIC_BUNDLE_RELOAD_INTERVAL', '2'))
+)
+
+# Conversation state, so follow-ups can omit the idea and name and reuse earlier responses
+session_store = session_store_from_env()
+
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '20'))
+MAX_NAME_COUNT = int(os.getenv('MAX_NAME_COUNT', '5000'))
+
+# Logo images render in a separate process pool, never on the chat workers
+logo_renderer = LogoRenderer(
+    cache_dir=os.getenv('LOGO_CACHE_DIR', os.path.join('.cache', 'logos')),
+    model=os.getenv('LOGO_RENDER_MODEL') or None,
+    max_workers=int(os.getenv('LOGO_RENDER_WORKERS', '1')),
+    max_pending=int(os.getenv('LOGO_RENDER_MAX_PENDING', '32')),
+    size=int(os.getenv('LOGO_RENDER_SIZE', '512')),
+    steps=int(os.getenv('LOGO_RENDER_STEPS', '4'))
+)
+
+metrics = Metrics()
+metrics.describe('http_requests_total', 'counter', "HTTP requests by endpoint, method and status")
+metrics.describe('http_request_duration_seconds', 'histogram', "Time to build each HTTP response")
+metrics.describe('chat_stage_duration_seconds', 'histogram', "Time spent in intent routing, each generator and JSON serialization")
+metrics.describe('chat_intents_total', 'counter', "Chat messages by routed intent")
+metrics.describe('chat_responses_total', 'counter', "Chat responses by type and where they were served from")
+metrics.describe('response_cache_hit_ratio', 'gauge', "Share of response cache lookups that hit")
+
+def collect_component_stats():
+    """Expose the response cache and generation backend counters at scrape time"""
+    stats = response_cache.stats()
+    samples = [
+        ('response_cache_hits_total', {}, stats['hits']),
+        ('response_cache_misses_total', {}, stats['misses']),
+        ('response_cache_evictions_total', {}, stats['evictions']),
+        ('response_cache_expirations_total', {}, stats['expirations']),
+        ('response_cache_entries', {}, stats['size']),
+        ('response_cache_hit_ratio', {}, stats['hit_rate'])
+    ]
+    sessions = session_store.stats()
+    if sessions['backend'] == 'memory':
+        samples += [
+            ('chat_sessions', {}, sessions['sessions']),
+            ('chat_session_evictions_total', {}, sessions['evictions']),
+            ('chat_session_expirations_total', {}, sessions['expirations'])
         ]
-        
-        # Customize ideas based on business type
-        business_category = self.categorize_business(business_idea.lower())
-        
-        if business_category == "restaurant":
-            base_ideas.extend([
-                "Create signature dishes with local ingredients",
-                "Offer cooking classes or food workshops",
-                "Implement a farm-to-table concept",
-                "Create themed dining experiences"
-            ])
-        elif business_category == "retail":
-            base_ideas.extend([
-                "Offer personal shopping services",
-                "Create seasonal product bundles",
-                "Implement AR try-before-you-buy features",
-                "Host community events in your store"
-            ])
-        elif business_category == "tech":
-            base_ideas.extend([
-                "Implement AI-powered customer support",
-                "Create API integrations with popular tools",
-                "Offer white-label solutions",
-                "Build a community platform for users"
-            ])
-        
-        return random.sample(base_ideas, min(6, len(base_ideas)))
+    bundle = bundle_source.stats()
+    samples += [
+        ('static_bundle_entries', {}, bundle.get('entries', 0)),
+        ('static_bundle_hits_total', {}, bundle.get('hits', 0)),
+        ('static_bundle_reloads_total', {}, bundle['reloads'])
+    ]
+    catalog = catalog_source.stats()
+    samples += [
+        ('catalog_info', {'version': catalog['version'], 'revision': catalog['revision']}, 1),
+        ('catalog_reloads_total', {}, catalog['reloads']),
+        ('catalog_reload_errors_total', {}, catalog['reload_errors'])
+    ]
+    if chatbot.categorizer is not None:
+        categorizer = chatbot.categorizer.stats()
+        for source in ('keyword_answers', 'model_answers', 'low_confidence', 'timeouts', 'errors'):
+            samples.append(('categorizer_answers_total', {'outcome': source}, categorizer[source]))
+        samples.append(('categorizer_cache_hit_ratio', {}, categorizer['cache']['hit_rate']))
+    encoding = response_encoder.stats()
+    samples += [
+        ('response_bytes_before_compression_total', {}, encoding['bytes_before_compression']),
+        ('response_bytes_after_compression_total', {}, encoding['bytes_after_compression'])
+    ]
+    if admission.enabled:
+        admitted = admission.stats()
+        samples.append(('admission_admitted_total', {}, admitted['admitted']))
+        samples.append(('admission_queued_total', {}, admitted['queued']))
+        for reason, count in admitted['rejected'].items():
+            samples.append(('admission_rejected_total', {'reason': reason}, count))
+        if 'active' in admitted:
+            samples.append(('admission_active_requests', {}, admitted['active']))
+            samples.append(('admission_waiting_requests', {}, admitted['waiting']))
+    if chatbot.backend is not None:
+        backend = chatbot.backend.stats()
+        for outcome in ('completed', 'timeouts', 'errors', 'rejected'):
+            samples.append(('generation_backend_calls_total', {'outcome': outcome}, backend[outcome]))
+    return samples
 
-chatbot = SmallBusinessChatbot()
+metrics.register_collector(collect_component_stats)
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    data = request.json
-    message = data.get('message', '').lower()
-    business_idea = data.get('business_idea', '')
-    
-    response = {
-        'message': '',
-        'type': 'text',
-        'data': None
-    }
-    
-    if 'steps' in message or 'plan' in message or 'how to start' in message:
-        if not business_idea:
-            response['message'] = "I'd love to help you create a business plan! Could you tell me more about your business idea?"
-        else:
-            steps = chatbot.generate_business_steps('general', business_idea)
-            response['message'] = f"Here's a comprehensive step-by-step plan for your {business_idea} business:"
-            response['type'] = 'steps'
-            response['data'] = steps
-    
-    elif 'name' in message and ('suggest' in message or 'generate' in message):
-        if not business_idea:
-            response['message'] = "I'd be happy to suggest some creative names! What's your business idea?"
-        else:
-            names = chatbot.generate_business_names(business_idea)
-            response['message'] = f"Here are some creative and catchy names for your {business_idea} business:"
-            response['type'] = 'names'
-            response['data'] = names
-    
-    elif 'logo' in message:
-        business_name = data.get('business_name', '')
-        if not business_name or not business_idea:
-            response['message'] = "To create a logo, I'll need your business name and idea. Could you provide both?"
-        else:
-            logo_prompt = chatbot.generate_logo_prompt(business_name, business_idea)
-            response['message'] = f"Here's a detailed prompt for creating your logo. You can use this with AI image generators like DALL-E, Midjourney, or Stable Diffusion:"
-            response['type'] = 'logo_prompt'
-            response['data'] = logo_prompt
-    
-    elif any(platform in message for platform in ['linkedin', 'instagram', 'facebook', 'social media']):
-        business_name = data.get('business_name', business_idea.title() + ' Business')
-        platform = 'linkedin' if 'linkedin' in message else 'instagram' if 'instagram' in message else 'facebook' if 'facebook' in message else 'linkedin'
-        
-        if not business_idea:
-            response['message'] = "I'd love to create social media content for you! What's your business idea?"
-        else:
-            content = chatbot.generate_social_media_content(platform, business_name, business_idea)
-            response['message'] = f"Here's your {content['format']}:"
-            response['type'] = 'social_media'
-            response['data'] = content
-    
-    elif 'ideas' in message or 'innovative' in message or 'suggestions' in message:
-        if not business_idea:
-            response['message'] = "I'd be happy to suggest innovative ideas! What's your business concept?"
-        else:
-            ideas = chatbot.generate_innovative_ideas(business_idea)
-            response['message'] = f"Here are some innovative ideas to enhance your {business_idea} business:"
-            response['type'] = 'ideas'
-            response['data'] = ideas
+# Opt-in: profile a sample of requests and keep the profiles of slow ones
+slow_request_profiler = SlowRequestProfiler(
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', '0')),
+    threshold_ms=float(os.getenv('PROFILE_SLOW_MS', '250')),
+    output_dir=os.getenv('PROFILE_DIR', os.path.join('.cache', 'profiles'))
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.profiler = slow_request_profiler.start()
+
+# Rate limits and load shedding, applied before any generation work starts
+admission = admission_from_env()
+
+# Intent charged against the per-intent limits for endpoints that are not chat messages
+ADMISSION_ENDPOINT_INTENTS = {'bulk_names': 'names', 'render_logo': 'logo_render'}
+ADMISSION_ENDPOINTS = {'chat', 'chat_batch', 'chat_stream'} | set(ADMISSION_ENDPOINT_INTENTS)
+
+def requested_intents():
+    """Return the intents a request asks for and how many messages it carries"""
+    if request.endpoint in ADMISSION_ENDPOINT_INTENTS:
+        return [ADMISSION_ENDPOINT_INTENTS[request.endpoint]], 1
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args
+    data = data if isinstance(data, dict) else {}
+    messages = data.get('messages') if request.endpoint == 'chat_batch' else [data.get('message', '')]
+    messages = [message for message in messages if isinstance(message, str)] if isinstance(messages, list) else []
+    if not admission.intent_limits:
+        return [], max(1, len(messages))
+    intents = {chatbot.router.classify(message.lower())[0] or 'welcome' for message in messages[:MAX_BATCH_SIZE]}
+    return sorted(intents), max(1, len(messages))
+
+@app.before_request
+def admit_request():
+    if not admission.enabled or request.endpoint not in ADMISSION_ENDPOINTS:
+        return None
+    try:
+        intents, cost = requested_intents()
+        admission.admit(request.remote_addr or 'unknown', intents, min(cost, MAX_BATCH_SIZE))
+    except Rejected as rejection:
+        response = jsonify({'error': str(rejection), 'reason': rejection.reason})
+        response.status_code = rejection.status
+        response.headers['Retry-After'] = str(rejection.retry_after)
+        return response
+    g.admitted = True
+    return None
+
+@app.teardown_request
+def release_admission(error=None):
+    # Runs after a streamed response has finished, so streams hold their slot until done
+    if g.pop('admitted', False):
+        admission.leave()
+
+@app.after_request
+def record_request_metrics(response):
+    duration = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('http_request_duration_seconds', duration, endpoint=endpoint, method=request.method)
+    metrics.inc('http_requests_total', endpoint=endpoint, method=request.method, status=response.status_code)
+    profile_path = slow_request_profiler.finish(g.profiler, duration * 1000, endpoint)
+    if profile_path:
+        app.logger.warning("Slow request %s %s took %.0fms, profile saved to %s",
+                           request.method, request.path, duration * 1000, profile_path)
+    return response
+
+def cache_key_for(intent, platform, business_idea, business_name, seed=None, business_category=None):
+    """Return the response cache key for a request, or None if its output is not deterministic"""
+    if not business_idea:
+        return None
+    # Responses built from an older catalog must not be served after a reload
+    revision = chatbot.catalog.revision
+    # Randomized replies repeat only for a seed the client chose; fresh seeds never do.
+    # Steps, logos and ideas also depend on the category, which another categorizer
+    # (or a timed-out one) may resolve differently for the same idea
+    if intent == 'ideas' and seed is not None:
+        return (intent, revision, business_idea, business_category, seed)
+    if intent == 'names' and seed is not None and chatbot.backend is None:
+        return (intent, revision, business_idea, seed)
+    if intent == 'steps':
+        return (intent, revision, business_idea, business_category)
+    if intent == 'logo':
+        return (intent, revision, business_idea, business_category, business_name)
+    if intent == 'social_media':
+        return (intent, revision, business_idea, business_name, platform)
+    return None
+
+def wants_session(data):
+    """Whether a request without a session_id asks for one to be started"""
+    return data.get('session') in (True, 'true', '1')
+
+def open_session(data):
+    """Load the request's session, or start one, and merge in the idea and name it sends.
+
+    Returns (session_id, session); the session carries the idea, name and category to use.
+    Only requests that send a session_id or "session": true get one stored; for any other
+    request session_id is None and the session lasts for that request alone.
+    """
+    session_id = data.get('session_id')
+    if not is_valid_session_id(session_id):
+        session_id = new_session_id() if wants_session(data) else None
+    session = (session_store.get(session_id) if session_id is not None else None) or new_session()
     
-    else:
-        response['message'] = """Welcome to your Small Business Assistant! 🚀
+    business_idea = normalize_idea(data.get('business_idea') or '')
+    if business_idea and business_idea != session['idea']:
+        # Everything remembered was derived from the previous idea
+        session.update(idea=business_idea, category=None, category_provisional=False, artifacts={})
+    if data.get('business_name'):
+        session['name'] = data['business_name']
+    # A provisional category is asked for again, by which time the model's answer is usually cached
+    if session['idea'] and (session['category'] is None or session.get('category_provisional')):
+        session['category'], session['category_provisional'] = chatbot.categorize_business_with_status(session['idea'].lower())
+    return session_id, session
+
+def cached_body(cache_key, session):
+    """Look a response up in the session first, then the static bundle, then the shared response cache"""
+    artifact_key = json.dumps(cache_key)
+    body = session_store.recall(session, artifact_key) if session is not None else None
+    if body is not None:
+        return body, 'session'
+    bundle = bundle_source.current()
+    if bundle is not None:
+        body = bundle.get(artifact_key.encode('utf-8'))
+        if body is not None:
+            return body, 'bundle'
+    body = response_cache.get(cache_key)
+    if body is not None and session is not None:
+        session_store.remember(session, artifact_key, body)
+    return body, 'hit'
+
+def bundled_seed(intent, business_idea, business_category=None):
+    """One of the bundle's seeds if it holds this idea's reply, so an unseeded request is served from it"""
+    bundle = bundle_source.current()
+    if bundle is None or not bundle.seeds:
+        return None
+    seed = secrets.choice(bundle.seeds)
+    cache_key = cache_key_for(intent, None, business_idea, None, seed, business_category)
+    if cache_key is None or json.dumps(cache_key).encode('utf-8') not in bundle:
+        return None
+    return seed
+
+def should_store(cache_key, fell_back):
+    """Whether a freshly generated reply may be cached and remembered in the session; a template
+    standing in for a failed model call would otherwise be served in place of the real answer"""
+    return cache_key is not None and not fell_back
+
+def store_body(cache_key, body, session):
+    response_cache.set(cache_key, body)
+    if session is not None:
+        session_store.remember(session, json.dumps(cache_key), body)
+
+# Compresses and tags serialized bodies; fixed replies are compressed once at startup
+response_encoder = ResponseEncoder(
+    min_size=int(os.getenv('COMPRESS_MIN_SIZE', '512')),
+    gzip_level=int(os.getenv('COMPRESS_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+)
+
+def json_response(body, status=200):
+    """Wrap an already serialized JSON body in a compressed, ETagged response"""
+    return response_encoder.response(app, request, body, status)
+
+WELCOME_MESSAGE = """Welcome to your Small Business Assistant! 🚀
 
 I'm here to help you turn your business idea into reality. Here's what I can do for you:
 
@@ -301,12 +318,372 @@ Examples:
 - "Create a LinkedIn post for my consulting firm"
 - "Give me innovative ideas for my bakery"
 """
+
+# Response types whose data is a list, streamed one item per event
+LIST_RESPONSE_TYPES = ('steps', 'names', 'ideas')
+
+# Intents whose replies depend on the business category
+CATEGORY_INTENTS = ('steps', 'logo', 'ideas')
+
+# Generator behind each response type, used as the stage label in timings
+GENERATOR_NAMES = {
+    'steps': 'generate_business_steps',
+    'names': 'generate_business_names',
+    'logo_prompt': 'generate_logo_prompt',
+    'social_media': 'generate_social_media_content',
+    'ideas': 'generate_innovative_ideas'
+}
+
+def plan_chat(message, business_idea, business_name=None, business_category=None, seed=None):
+    """Route one chat message without generating anything yet; returns plan_intent's plan"""
+    with metrics.timer('chat_stage_duration_seconds', stage='route'):
+        intent, platform = chatbot.router.classify(message.lower())
+    metrics.inc('chat_intents_total', intent=intent or 'welcome')
+    return plan_intent(intent, platform, business_idea, business_name, business_category, seed)
+
+def plan_intent(intent, platform, business_idea, business_name=None, business_category=None, seed=None):
+    """Plan the reply to a routed intent.
+
+    Returns (cache_key, response_type, header_message, produce, seed) where produce is
+    a partial of the SmallBusinessChatbot generator to call, or None for text replies,
+    and seed is the seed that regenerates a randomized reply, or None.
+    """
+    if business_category is None and business_idea and intent in CATEGORY_INTENTS:
+        # The generators would categorize anyway; resolving it here puts it in the cache key
+        business_category = chatbot.categorize_business(business_idea.lower())
+    if seed is None and intent in ('names', 'ideas'):
+        seed = bundled_seed(intent, business_idea, business_category)
+    cache_key = cache_key_for(intent, platform, business_idea, business_name, seed, business_category)
+
+    if intent == 'steps':
+        if not business_idea:
+            return cache_key, 'text', "I'd love to help you create a business plan! Could you tell me more about your business idea?", None, None
+        return (
+            cache_key, 'steps',
+            f"Here's a comprehensive step-by-step plan for your {business_idea} business:",
+            partial(chatbot.generate_business_steps, 'general', business_idea, business_category),
+            None
+        )
+    
+    elif intent == 'names':
+        if not business_idea:
+            return cache_key, 'text', "I'd be happy to suggest some creative names! What's your business idea?", None, None
+        seed = new_seed() if seed is None else seed
+        return (
+            cache_key, 'names',
+            f"Here are some creative and catchy names for your {business_idea} business:",
+            partial(chatbot.generate_business_names, business_idea, rng=rng_for(seed)),
+            # Names written by a model can't be regenerated from the seed
+            seed if chatbot.backend is None else None
+        )
+    
+    elif intent == 'logo':
+        if not business_name or not business_idea:
+            return cache_key, 'text', "To create a logo, I'll need your business name and idea. Could you provide both?", None, None
+        return (
+            cache_key, 'logo_prompt',
+            f"Here's a detailed prompt for creating your logo. You can use this with AI image generators like DALL-E, Midjourney, or Stable Diffusion:",
+            partial(chatbot.generate_logo_prompt, business_name, business_idea, business_category),
+            None
+        )
+    
+    elif intent == 'social_media':
+        if business_name is None:
+            business_name = business_idea.title() + ' Business'
+        
+        if not business_idea:
+            return cache_key, 'text', "I'd love to create social media content for you! What's your business idea?", None, None
+        post_format = chatbot.social_templates.get(platform, ('General Social Media',))[0]
+        return (
+            cache_key, 'social_media',
+            f"Here's your {post_format}:",
+            partial(chatbot.social_media_post, platform, business_name, business_idea),
+            None
+        )
+    
+    elif intent == 'ideas':
+        if not business_idea:
+            return cache_key, 'text', "I'd be happy to suggest innovative ideas! What's your business concept?", None, None
+        seed = new_seed() if seed is None else seed
+        return (
+            cache_key, 'ideas',
+            f"Here are some innovative ideas to enhance your {business_idea} business:",
+            partial(chatbot.generate_innovative_ideas, business_idea, business_category, rng_for(seed)),
+            seed
+        )
     
-    return jsonify(response)
+    return cache_key, 'text', WELCOME_MESSAGE, None, None
+
+@lru_cache(maxsize=32)
+def static_text_body(response_type, message):
+    """Serialize a fixed reply once and precompute its compressed forms"""
+    body = app.json.dumps({'message': message, 'type': response_type, 'data': None}).encode('utf-8')
+    response_encoder.register_static(body)
+    return body
+
+# The welcome reply is the most common fixed body; compress it before the first request
+static_text_body('text', WELCOME_MESSAGE)
+
+def generator_result(response_type, result):
+    """(data, fell_back) from a generator's return value; only social posts can fall back"""
+    return result if response_type == 'social_media' else (result, False)
+
+def run_generator(response_type, produce):
+    """Call a planned generator, timing it under its SmallBusinessChatbot method name; returns (data, fell_back)"""
+    with metrics.timer('chat_stage_duration_seconds', stage=GENERATOR_NAMES[response_type]):
+        return generator_result(response_type, produce())
+
+def chat_response(header, response_type, data, seed=None):
+    """The JSON object of one chat reply"""
+    response = {'message': header, 'type': response_type, 'data': data}
+    if seed is not None:
+        # Sending the seed back with the same message regenerates this reply exactly
+        response['seed'] = seed
+    return response
+
+def serialize_response(response):
+    with metrics.timer('chat_stage_duration_seconds', stage='serialize'):
+        return app.json.dumps(response).encode('utf-8')
+
+def cache_outcome(cache_key, stored):
+    """The chat_responses_total cache label of a freshly generated reply"""
+    if cache_key is None:
+        return 'none'
+    return 'miss' if stored else 'fallback'
+
+def build_chat_body(message, business_idea, business_name=None, business_category=None, session=None, seed=None):
+    """Answer one chat message and return the serialized JSON response body"""
+    cache_key, response_type, header, produce, seed = plan_chat(message, business_idea, business_name, business_category, seed)
+    if produce is None:
+        # Text replies are fixed strings, so their bodies never change
+        metrics.inc('chat_responses_total', type=response_type, cache='static')
+        return static_text_body(response_type, header)
+    if cache_key is not None:
+        body, source = cached_body(cache_key, session)
+        if body is not None:
+            metrics.inc('chat_responses_total', type=response_type, cache=source)
+            return body
+    
+    data, fell_back = run_generator(response_type, produce)
+    body = serialize_response(chat_response(header, response_type, data, seed))
+    stored = should_store(cache_key, fell_back)
+    if stored:
+        store_body(cache_key, body, session)
+    metrics.inc('chat_responses_total', type=response_type, cache=cache_outcome(cache_key, stored))
+    return body
+
+def sse_event(event, payload):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+def chat_events(message, business_idea, business_name=None, business_category=None, session=None, seed=None):
+    """Yield the SSE events for one chat message, sending the header before any generation runs"""
+    cache_key, response_type, header, produce, seed = plan_chat(message, business_idea, business_name, business_category, seed)
+    header_event = {'message': header, 'type': response_type}
+    if seed is not None:
+        header_event['seed'] = seed
+    yield sse_event('message', header_event)
+    
+    if produce is None:
+        metrics.inc('chat_responses_total', type=response_type, cache='static')
+    else:
+        body, source = cached_body(cache_key, session) if cache_key is not None else (None, None)
+        if body is not None:
+            data = json.loads(body)['data']
+        else:
+            data, fell_back = run_generator(response_type, produce)
+            stored = should_store(cache_key, fell_back)
+            if stored:
+                store_body(cache_key, serialize_response(chat_response(header, response_type, data, seed)), session)
+            source = cache_outcome(cache_key, stored)
+        metrics.inc('chat_responses_total', type=response_type, cache=source)
+        
+        if response_type in LIST_RESPONSE_TYPES:
+            for item in data:
+                yield sse_event('item', item)
+        else:
+            yield sse_event('data', data)
+    
+    yield sse_event('done', {})
+
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    data = request.json
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    session_id, session = open_session(data)
+    body = build_chat_body(data.get('message', ''), session['idea'], session['name'], session['category'], session, seed)
+    
+    response = json_response(body)
+    if session_id is not None:
+        session_store.save(session_id, session)
+        response.headers['X-Session-Id'] = session_id
+    return response
+
+@app.route('/api/welcome', methods=['GET'])
+def welcome():
+    # Static body with a strong ETag, so clients can revalidate it with If-None-Match
+    return json_response(static_text_body('text', WELCOME_MESSAGE))
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    data = request.json
+    messages = data.get('messages')
+    if not isinstance(messages, list) or not all(isinstance(message, str) for message in messages):
+        return jsonify({'error': "'messages' must be a list of strings"}), 400
+    if len(messages) > MAX_BATCH_SIZE:
+        return jsonify({'error': f"A batch can hold at most {MAX_BATCH_SIZE} messages"}), 400
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    # The session categorizes the idea once for every generator in the batch
+    session_id, session = open_session(data)
+    bodies = [
+        # One batch seed gives each message its own, so two names requests still differ
+        build_chat_body(message, session['idea'], session['name'], session['category'], session,
+                        derive_seed(seed, index) if seed is not None else None)
+        for index, message in enumerate(messages)
+    ]
+    
+    response = json_response(b'[' + b','.join(bodies) + b']')
+    if session_id is not None:
+        session_store.save(session_id, session)
+        response.headers['X-Session-Id'] = session_id
+    return response
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+def chat_stream():
+    # GET with query parameters lets browsers connect with a plain EventSource
+    data = request.json if request.method == 'POST' else request.args
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    session_id, session = open_session(data)
+    
+    def events():
+        yield from chat_events(data.get('message', ''), session['idea'], session['name'], session['category'], session, seed)
+        if session_id is not None:
+            session_store.save(session_id, session)
+    
+    # no-transform keeps compressing proxies from buffering events until the stream ends
+    headers = {'Cache-Control': 'no-cache, no-transform', 'X-Accel-Buffering': 'no'}
+    if session_id is not None:
+        headers['X-Session-Id'] = session_id
+    return app.response_class(stream_with_context(events()), mimetype='text/event-stream', headers=headers)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route('/api/sessions/stats', methods=['GET'])
+def session_stats():
+    return jsonify(session_store.stats())
+
+@app.route('/api/catalog', methods=['GET'])
+def catalog_info():
+    return jsonify(catalog_source.stats())
+
+@app.route('/api/bundle/stats', methods=['GET'])
+def bundle_stats():
+    return jsonify(bundle_source.stats())
+
+@app.route('/api/admission/stats', methods=['GET'])
+def admission_stats():
+    return jsonify(admission.stats())
+
+@app.route('/api/backend/stats', methods=['GET'])
+def backend_stats():
+    if chatbot.backend is None:
+        return jsonify({'provider': 'template'})
+    return jsonify(chatbot.backend.stats())
+
+@app.route('/api/names', methods=['POST'])
+def bulk_names():
+    data = request.json
+    business_idea = normalize_idea(data.get('business_idea', ''))
+    if not business_idea:
+        return jsonify({'error': "'business_idea' is required"}), 400
+    try:
+        count = int(data.get('count', 100))
+    except (TypeError, ValueError):
+        return jsonify({'error': "'count' must be an integer"}), 400
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    if not 0 < count <= MAX_NAME_COUNT:
+        return jsonify({'error': f"'count' must be between 1 and {MAX_NAME_COUNT}"}), 400
+    
+    seed = new_seed() if seed is None else seed
+    names = chatbot.name_generator.sample(business_idea, count, rng_for(seed))
+    # Thousands of names compress well, so send them through the encoder
+    return json_response(app.json.dumps({
+        'names': names,
+        'available': chatbot.name_generator.space_size(business_idea),
+        'seed': seed
+    }).encode('utf-8'))
+
+def logo_job_response(status):
+    """Add the image URL to a finished job and pick the matching HTTP status"""
+    if status['status'] == 'done':
+        status['image_url'] = f"/api/logo/images/{status['job_id']}.png"
+    if status['status'] in ('done', 'failed'):
+        return jsonify(status), 200
+    if status['status'] == 'unknown':
+        return jsonify(status), 404
+    return jsonify(status), 202
+
+@app.route('/api/logo/render', methods=['POST'])
+def render_logo():
+    data = request.json
+    prompt = data.get('prompt')
+    if not prompt:
+        business_name = data.get('business_name')
+        business_idea = normalize_idea(data.get('business_idea', ''))
+        if not business_name or not business_idea:
+            return jsonify({'error': "Provide a 'prompt', or a 'business_name' and 'business_idea'"}), 400
+        prompt = chatbot.generate_logo_prompt(business_name, business_idea)
+    
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    try:
+        status = logo_renderer.submit(prompt, seed or 0, retry=bool(data.get('retry')))
+    except RenderQueueFull as error:
+        return jsonify({'error': str(error)}), 503, {'Retry-After': '5'}
+    return logo_job_response(status)
+
+@app.route('/api/logo/jobs/<job_id>', methods=['GET'])
+def logo_job(job_id):
+    return logo_job_response(logo_renderer.status(job_id))
+
+@app.route('/api/logo/images/<job_id>.png', methods=['GET'])
+def logo_image(job_id):
+    if not re.fullmatch(r'[0-9a-f]{64}', job_id):
+        abort(404)
+    # Content-addressed, so a given URL always serves the same bytes
+    return send_from_directory(os.path.abspath(logo_renderer.cache_dir), f"{job_id}.png",
+                               mimetype='image/png', max_age=31536000)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only; use `python3 run.py serve` for real traffic
+    app.run(
+        debug=os.getenv('FLASK_DEBUG', 'False').lower() in ('1', 'true'),
+        host='0.0.0.0',
+        port=int(os.getenv('PORT', '5000'))
+    )
\ No newline at end of file
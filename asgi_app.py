@@ -0,0 +1,264 @@
+"""
+ASGI App - the /api/chat, /health and /metrics endpoints on an event loop, for
+deployments that keep thousands of slow or idle connections open per worker.
+
+Routing, sessions, the response cache, rate limits and response encoding are
+shared with the Flask app, so both servers give identical answers. Requests are
+driven on the loop and only the work that can block leaves it: the template
+generators run on a small thread pool, model calls are awaited through the
+generation backend, and session loads and saves use the pool only when they
+can block (a Redis store or a model categorizer).
+
+ADMISSION_MAX_ACTIVE bounds the threads of a Flask worker; here connections
+hold no thread, so ASGI_MAX_INFLIGHT bounds the requests in progress instead.
+
+Only /api/chat, /health and /metrics are served; streaming, batch, logo and
+the other endpoints answer 404 here and need the Flask app, which the React
+client also relies on.
+
+    python3 run.py serve --server asgi --workers 1
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import time
+from datetime import datetime
+
+from admission import MemoryRateLimiter, Rejected
+from seeds import parse_seed
+from app import (
+    GENERATOR_NAMES, app as flask_app, admission, cache_outcome, cached_body, chat_response, chatbot, generator_result,
+    metrics, open_session, plan_chat, response_encoder, run_generator, serialize_response, session_store,
+    should_store, static_text_body, store_body
+)
+from session_store import MemorySessionStore
+
+logger = logging.getLogger(__name__)
+
+# Template generators are CPU-bound; a few threads keep them off the loop
+executor = concurrent.futures.ThreadPoolExecutor(
+    int(os.getenv('ASGI_EXECUTOR_THREADS', str(min(8, (os.cpu_count() or 1) + 2)))),
+    thread_name_prefix='asgi-generate'
+)
+MAX_INFLIGHT = int(os.getenv('ASGI_MAX_INFLIGHT', '0'))
+MAX_BODY_BYTES = int(os.getenv('ASGI_MAX_BODY_BYTES', str(1024 * 1024)))
+CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
+
+# In-memory sessions and buckets answer in microseconds; anything else may wait on I/O
+PREPARE_BLOCKS = (not isinstance(session_store, MemorySessionStore) or chatbot.categorizer is not None
+                  or not isinstance(admission.rate_limiter, MemoryRateLimiter))
+SAVE_BLOCKS = not isinstance(session_store, MemorySessionStore)
+
+inflight = 0
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = list(headers)
+
+
+async def offload(blocking, func, *args):
+    """Run func on the executor when it may block, else inline on the loop"""
+    if not blocking:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def prepare_chat(data, client):
+    """Charge the rate limits and open the session, as the Flask app's before_request and chat() do"""
+    if admission.client_limit or admission.intent_limits:
+        intents = []
+        if admission.intent_limits and isinstance(data.get('message', ''), str):
+            intents = [chatbot.router.classify(data.get('message', '').lower())[0] or 'welcome']
+        admission.check_rates(client, intents)
+    return open_session(data)
+
+
+async def generate(response_type, produce):
+    """Await the generator's model-backed variant when there is one, else run it on the executor; returns (data, fell_back)"""
+    async_variant = getattr(chatbot, f"{produce.func.__name__}_async", None)
+    if chatbot.backend is not None and async_variant is not None:
+        with metrics.timer('chat_stage_duration_seconds', stage=GENERATOR_NAMES[response_type]):
+            return generator_result(response_type, await async_variant(*produce.args, **produce.keywords))
+    return await asyncio.get_running_loop().run_in_executor(executor, run_generator, response_type, produce)
+
+
+async def build_chat_body(message, business_idea, business_name=None, business_category=None, session=None, seed=None):
+    """Awaitable app.build_chat_body: the same caches and bodies, with generation off the loop"""
+    cache_key, response_type, header, produce, seed = plan_chat(message, business_idea, business_name, business_category, seed)
+    if produce is None:
+        metrics.inc('chat_responses_total', type=response_type, cache='static')
+        return static_text_body(response_type, header)
+    if cache_key is not None:
+        body, source = cached_body(cache_key, session)
+        if body is not None:
+            metrics.inc('chat_responses_total', type=response_type, cache=source)
+            return body
+
+    data, fell_back = await generate(response_type, produce)
+    body = serialize_response(chat_response(header, response_type, data, seed))
+    stored = should_store(cache_key, fell_back)
+    if stored:
+        store_body(cache_key, body, session)
+    metrics.inc('chat_responses_total', type=response_type, cache=cache_outcome(cache_key, stored))
+    return body
+
+
+async def chat(request):
+    if 'json' not in request['headers'].get('content-type', ''):
+        raise HTTPError(415, "Did not attempt to load JSON data because the request Content-Type was not 'application/json'.")
+    try:
+        data = flask_app.json.loads(request['body'])
+    except ValueError:
+        raise HTTPError(400, "Failed to decode JSON object")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Expected a JSON object")
+    try:
+        seed = parse_seed(data.get('seed'))
+    except ValueError as error:
+        raise HTTPError(400, str(error))
+
+    global inflight
+    if MAX_INFLIGHT and inflight >= MAX_INFLIGHT:
+        admission.record_rejection('queue_full')
+        raise HTTPError(503, "The server is busy, please retry shortly", [('retry-after', '1')])
+    inflight += 1
+    try:
+        try:
+            session_id, session = await offload(PREPARE_BLOCKS, prepare_chat, data, request['client'])
+        except Rejected as rejection:
+            raise HTTPError(rejection.status, str(rejection), [('retry-after', str(rejection.retry_after))])
+        if admission.enabled or MAX_INFLIGHT:
+            admission.record_admission()
+        body = await build_chat_body(data.get('message', ''), session['idea'], session['name'], session['category'],
+                                     session, seed)
+        if session_id is None:
+            return 200, body, []
+        await offload(SAVE_BLOCKS, session_store.save, session_id, session)
+    finally:
+        inflight -= 1
+    return 200, body, [('x-session-id', session_id)]
+
+
+async def health(request):
+    return 200, flask_app.json.dumps({'status': 'healthy', 'timestamp': datetime.now().isoformat()}).encode('utf-8'), []
+
+
+async def prometheus_metrics(request):
+    return 200, metrics.render().encode('utf-8'), [('content-type', 'text/plain; version=0.0.4')]
+
+
+ROUTES = {
+    '/api/chat': ('POST', chat),
+    '/health': ('GET', health),
+    '/metrics': ('GET', prometheus_metrics)
+}
+
+
+def cors_headers(request, preflight=False):
+    origin = request['headers'].get('origin')
+    if origin is None:
+        return []
+    if '*' in CORS_ORIGINS:
+        headers = [('access-control-allow-origin', '*')]
+    elif origin in CORS_ORIGINS:
+        headers = [('access-control-allow-origin', origin), ('vary', 'Origin')]
+    else:
+        return []
+    if preflight:
+        headers += [('access-control-allow-methods', 'GET, POST, OPTIONS')]
+        if 'access-control-request-headers' in request['headers']:
+            headers += [('access-control-allow-headers', request['headers']['access-control-request-headers'])]
+    else:
+        headers += [('access-control-expose-headers', 'X-Session-Id')]
+    return headers
+
+
+async def read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionResetError("Client disconnected")
+        chunks.append(message.get('body', b''))
+        size += len(chunks[-1])
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_response(send, request, status, body, headers):
+    headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    if not any(name == b'content-type' for name, _ in headers):
+        headers.append((b'content-type', flask_app.json.mimetype.encode('latin-1')))
+    if status == 200 and body:
+        body, coding, etag = response_encoder.encode(body, request['headers'].get('accept-encoding'))
+        headers += [(b'vary', b'Accept-Encoding'), (b'etag', f'"{etag}"'.encode('latin-1'))]
+        if coding is not None:
+            headers.append((b'content-encoding', coding.encode('latin-1')))
+    headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body if request['method'] != 'HEAD' else b''})
+
+
+async def handle_http(scope, receive, send):
+    started = time.perf_counter()
+    request = {
+        'method': scope['method'],
+        'headers': {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']},
+        'client': (scope.get('client') or ('unknown',))[0],
+        'body': b''
+    }
+    route = ROUTES.get(scope['path'])
+    endpoint = scope['path'] if route else 'unmatched'
+
+    try:
+        if route is None:
+            raise HTTPError(404, "Not Found")
+        method, handler = route
+        if request['method'] == 'OPTIONS':
+            status, body, headers = 200, b'', cors_headers(request, preflight=True) + [('allow', f"{method}, OPTIONS")]
+        elif request['method'] not in (method, 'HEAD' if method == 'GET' else method):
+            raise HTTPError(405, "Method Not Allowed", [('allow', f"{method}, OPTIONS")])
+        else:
+            if request['method'] == 'POST':
+                request['body'] = await read_body(receive)
+            status, body, headers = await handler(request)
+            headers = headers + cors_headers(request)
+    except HTTPError as error:
+        status, headers = error.status, error.headers + cors_headers(request)
+        body = flask_app.json.dumps({'error': str(error)}).encode('utf-8')
+    except ConnectionResetError:
+        return
+    except Exception:
+        logger.exception("Unhandled error on %s %s", scope['method'], scope['path'])
+        status, headers = 500, cors_headers(request)
+        body = flask_app.json.dumps({'error': "Internal Server Error"}).encode('utf-8')
+
+    await send_response(send, request, status, body, headers)
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint, method=scope['method'])
+    metrics.inc('http_requests_total', endpoint=endpoint, method=scope['method'], status=status)
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application"""
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
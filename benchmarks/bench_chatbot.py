@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Chatbot Micro-Benchmarks
+Times each SmallBusinessChatbot method, the intent router and the request
+builder in isolation, and saves the results as JSON for comparison.
+
+Usage:
+    python3 benchmarks/bench_chatbot.py
+    python3 benchmarks/bench_chatbot.py --compare benchmarks/results/micro-<commit>-<time>.json
+"""
+
+import argparse
+import os
+import random
+import timeit
+
+from common import compare, save_results
+
+# Generation and the response cache are measured here, not bundle lookups
+os.environ['STATIC_BUNDLE_PATH'] = ''
+
+from app import build_chat_body, chatbot, response_cache
+
+IDEAS = ["coffee shop", "online tutoring service", "handmade jewelry business", "mobile app for dog walkers"]
+MESSAGES = ["give me the steps", "can you suggest a name", "create an instagram post", "hello there"]
+
+
+def benchmarks():
+    """Name -> zero-argument callable making one call per idea (or message)"""
+    ideas = IDEAS
+    return {
+        'router.classify': lambda: [chatbot.router.classify(message) for message in MESSAGES],
+        'categorize_business': lambda: [chatbot.categorize_business(idea) for idea in ideas],
+        'generate_business_steps': lambda: [chatbot.generate_business_steps('general', idea) for idea in ideas],
+        'generate_business_names': lambda: [chatbot.generate_business_names(idea) for idea in ideas],
+        'generate_logo_prompt': lambda: [chatbot.generate_logo_prompt("Bean Co", idea) for idea in ideas],
+        'generate_social_media_content': lambda: [
+            chatbot.generate_social_media_content(platform, "Bean Co", idea)
+            for idea, platform in zip(ideas, ('linkedin', 'instagram', 'facebook', 'linkedin'))
+        ],
+        'generate_innovative_ideas': lambda: [chatbot.generate_innovative_ideas(idea) for idea in ideas],
+        'build_chat_body.uncached': lambda: [
+            (response_cache.clear(), build_chat_body("give me the steps", idea)) for idea in ideas
+        ],
+        'build_chat_body.cached': lambda: [build_chat_body("give me the steps", idea) for idea in ideas],
+    }
+
+
+def run(name, function, repeat):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    # Best of several runs is the least noisy estimate of the achievable cost
+    best = min(timer.repeat(repeat=repeat, number=number)) / number / len(IDEAS)
+    return {'us_per_call': best * 1e6, 'calls_per_second': 1 / best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the chatbot generators")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--compare', help="Saved micro benchmark JSON to compare against")
+    parser.add_argument('--output', help="Where to save results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = {}
+    print(f"{'benchmark':<32} {'µs/call':>10} {'calls/s':>12}")
+    for name, function in benchmarks().items():
+        if args.filter not in name:
+            continue
+        results[name] = run(name, function, args.repeat)
+        print(f"{name:<32} {results[name]['us_per_call']:>10.2f} {results[name]['calls_per_second']:>12,.0f}")
+
+    save_results('micro', results, args.output)
+    if args.compare:
+        compare(args.compare, results, 'us_per_call')
+
+
+if __name__ == '__main__':
+    main()
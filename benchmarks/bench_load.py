@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Chat API Load Test
+Replays a weighted mix of recorded /api/chat requests against the app, either
+in-process through the Flask test client or over HTTP against a real server,
+and reports throughput and p50/p95/p99 latency overall and per response type.
+
+Usage:
+    python3 benchmarks/bench_load.py                                 # Flask test client
+    python3 benchmarks/bench_load.py --spawn-server --workers 2      # starts `run.py serve`
+    python3 benchmarks/bench_load.py --spawn-server --server asgi    # the same against the ASGI app
+    python3 benchmarks/bench_load.py --url http://127.0.0.1:5000     # an already running server
+    python3 benchmarks/bench_load.py --seeded                        # replayable: same --seed, same bytes
+"""
+
+import argparse
+import hashlib
+import concurrent.futures
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from common import ROOT, compare, latency_summary, save_results
+from seeds import derive_seed
+
+DEFAULT_MIX = os.path.join(ROOT, 'benchmarks', 'traffic_mix.json')
+
+
+def load_requests(mix_path, count, seed, seeded=False):
+    """Draw count request payloads from the weighted mix, reproducibly.
+
+    With seeded, every payload without a recorded seed gets one derived from the
+    run seed, so names and ideas come back identical on every replay.
+    """
+    with open(mix_path) as handle:
+        mix = json.load(handle)
+    payloads = [{key: value for key, value in entry.items() if key != 'weight'} for entry in mix]
+    payloads = random.Random(seed).choices(payloads, weights=[entry['weight'] for entry in mix], k=count)
+    if seeded:
+        payloads = [payload if 'seed' in payload else dict(payload, seed=derive_seed(seed, index))
+                    for index, payload in enumerate(payloads)]
+    return payloads
+
+
+class TestClientTarget:
+    def __init__(self):
+        from app import app
+        self.app = app
+        self.local = threading.local()
+
+    def post(self, payload):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.post('/api/chat', json=payload)
+        return response.status_code, response.data
+
+
+class HttpTarget:
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.local = threading.local()
+
+    def post(self, payload):
+        # One keep-alive connection per thread, as a browser or proxy would hold
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            connection.request('POST', '/api/chat', body=json.dumps(payload),
+                               headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(workers, threads, server='wsgi', env=None):
+    """Start the production server on a free port and wait until /health answers"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, 'run.py', 'serve', '--server', server, '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--threads', str(threads)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, **(env or {}))
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not become healthy within 20 seconds")
+
+
+def run_load(target, payloads, concurrency):
+    def timed(payload):
+        start = time.perf_counter()
+        try:
+            status, body = target.post(payload)
+            response_type = json.loads(body).get('type', 'unknown') if status == 200 else f'http_{status}'
+        except Exception:
+            response_type, body = 'error', b''
+        return response_type, time.perf_counter() - start, body
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        samples = list(pool.map(timed, payloads))
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /api/chat")
+    parser.add_argument('--url', help="Base URL of a running server (default: Flask test client)")
+    parser.add_argument('--spawn-server', action='store_true', help="Start `run.py serve` for the test")
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi', help="Server started by --spawn-server")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="JSON list of weighted request payloads")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--seeded', action='store_true',
+                        help="Send a seed with every request so the responses replay byte for byte")
+    parser.add_argument('--compare', help="Saved load test JSON to compare against")
+    parser.add_argument('--output', help="Where to save results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server, args.url = spawn_server(args.workers, args.threads, args.server)
+    target = HttpTarget(args.url) if args.url else TestClientTarget()
+    label = args.url or 'flask-test-client'
+
+    try:
+        payloads = load_requests(args.mix, args.requests, args.seed, args.seeded)
+        # A short warm-up so imports, caches and connections don't skew the numbers
+        run_load(target, payloads[:min(200, len(payloads))], args.concurrency)
+        samples, elapsed = run_load(target, payloads, args.concurrency)
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    # Equal digests mean two runs returned exactly the same bodies in the same order
+    digest = hashlib.sha256()
+    for _, _, body in samples:
+        digest.update(hashlib.sha256(body).digest())
+
+    results = {'overall': dict(latency_summary([latency for _, latency, _ in samples]),
+                               requests_per_second=len(samples) / elapsed)}
+    for response_type in sorted({response_type for response_type, _, _ in samples}):
+        latencies = [latency for kind, latency, _ in samples if kind == response_type]
+        results[f'type:{response_type}'] = latency_summary(latencies)
+
+    print(f"🚀 {len(samples)} requests against {label} with concurrency {args.concurrency}")
+    print(f"   {results['overall']['requests_per_second']:,.0f} req/s in {elapsed:.2f}s\n")
+    print(f"{'response type':<22} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, summary in results.items():
+        print(f"{name:<22} {summary['count']:>7} {summary['p50_ms']:>9.2f} "
+              f"{summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}")
+    print(f"\n🔁 Response digest: {digest.hexdigest()[:16]}" + ("" if args.seeded else " (unseeded, differs between runs)"))
+
+    results['config'] = {'target': label, 'requests': args.requests, 'concurrency': args.concurrency,
+                         'workers': args.workers if args.spawn_server else None,
+                         'server': args.server if args.spawn_server else None, 'seed': args.seed,
+                         'seeded': args.seeded, 'response_digest': digest.hexdigest()}
+    save_results('load', results, args.output)
+    if args.compare:
+        compare(args.compare, {name: value for name, value in results.items() if name != 'config'}, 'p95_ms')
+
+
+if __name__ == '__main__':
+    main()
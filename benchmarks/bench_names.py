@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Name Generation Benchmark
+Compares the sampled NameGenerator with the previous draw-then-deduplicate loop
+on throughput and on how many distinct names each returns per request.
+"""
+
+import argparse
+import random
+import time
+
+import common  # noqa: F401  (puts the repository root on sys.path)
+
+from name_generator import NameGenerator
+from app import chatbot
+
+
+def legacy_names(business_idea, count):
+    """The previous generate_business_names loop, kept here as the baseline"""
+    names = []
+    key_words = [word.title() for word in business_idea.split() if len(word) > 3]
+    for _ in range(count):
+        if random.choice([True, False]):
+            name = f"{random.choice(chatbot.funny_adjectives)} {random.choice(key_words)} {random.choice(chatbot.name_suffixes)}"
+        else:
+            name = f"{random.choice(chatbot.name_prefixes)} {random.choice(key_words)} {random.choice(chatbot.name_suffixes)}"
+        names.append(name)
+    return list(set(names))
+
+
+def measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark business name generation")
+    parser.add_argument('--idea', default="online coffee roasting subscription")
+    parser.add_argument('--counts', default="5,100,1000,10000")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    generator = NameGenerator(chatbot.name_prefixes, chatbot.funny_adjectives, chatbot.name_suffixes)
+    rng = random.Random(0)
+    print(f"🏷️  '{args.idea}': {generator.space_size(args.idea)} distinct combinations")
+    print(f"{'count':>7} | {'legacy names/s':>15} {'unique':>7} | {'sampled names/s':>16} {'unique':>7}")
+
+    for count in (int(value) for value in args.counts.split(',')):
+        legacy_time, legacy = measure(lambda: legacy_names(args.idea, count), args.repeat)
+        sampled_time, sampled = measure(lambda: generator.sample(args.idea, count, rng), args.repeat)
+        # Throughput counts distinct names actually returned to the caller
+        print(f"{count:>7} | {len(legacy) / legacy_time:>15,.0f} {len(legacy):>7} | "
+              f"{len(sampled) / sampled_time:>16,.0f} {len(sampled):>7}")
+
+
+if __name__ == '__main__':
+    main()
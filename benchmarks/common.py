@@ -0,0 +1,80 @@
+"""
+Shared helpers for the benchmark scripts: percentiles, result files and
+comparisons between runs.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies):
+    """Summarize latencies in seconds as milliseconds"""
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(kind, results, path=None):
+    """Write results with enough context to compare them against another commit"""
+    payload = {
+        'kind': kind,
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{kind}-{payload['commit'] or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, 'w') as handle:
+        json.dump(payload, handle, indent=2)
+    print(f"\n💾 Results saved to {path}")
+    return path
+
+
+def compare(baseline_path, results, metric, lower_is_better=True):
+    """Print the change of one metric per benchmark against a saved run"""
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+    print(f"\n📊 Compared with {baseline.get('commit')} ({baseline_path}):")
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if not previous or not previous.get(metric):
+            continue
+        change = (current[metric] - previous[metric]) / previous[metric]
+        better = change < 0 if lower_is_better else change > 0
+        marker = '✅' if better or abs(change) < 0.05 else '⚠️ '
+        print(f"  {marker} {name}: {previous[metric]:.2f} → {current[metric]:.2f} {metric} ({change:+.1%})")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Open-Connection Concurrency Benchmark
+Starts the Flask (gunicorn) and ASGI (uvicorn) servers side by side with one
+worker each, opens thousands of keep-alive connections to each at once and
+sends /api/chat requests over all of them, reporting throughput, latency,
+failed connections and errors per server.
+
+By default names are generated through the fake model provider, so every
+request waits on a slow upstream call the way a real model-backed deployment
+does; --backend template measures the pure template path instead.
+
+Usage:
+    python3 benchmarks/concurrency.py                                   # 2000 connections, both servers
+    python3 benchmarks/concurrency.py --connections 5000 --servers asgi
+    python3 benchmarks/concurrency.py --backend template --requests-per-connection 20
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import signal
+import time
+
+from common import compare, latency_summary, save_results
+from bench_load import spawn_server
+
+
+async def exchange(reader, writer, request):
+    """Send one request on a keep-alive connection and read the full response; returns the status"""
+    writer.write(request)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def hold_connection(host, port, request, count, timeout, start, samples, failures):
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        failures['connect'] += 1
+        return
+    # Every connection is open before the first request is sent
+    await start.wait()
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            status = await asyncio.wait_for(exchange(reader, writer, request), timeout)
+            samples.append((status, time.perf_counter() - started))
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+        failures['dropped'] += 1
+    except asyncio.TimeoutError:
+        failures['timeout'] += 1
+    finally:
+        writer.close()
+
+
+async def run_connections(url, payload, connections, count, timeout):
+    host, port = url.rsplit('//', 1)[1].split(':')
+    body = json.dumps(payload).encode('utf-8')
+    request = (f"POST /api/chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+
+    start = asyncio.Event()
+    samples, failures = [], {'connect': 0, 'dropped': 0, 'timeout': 0}
+    tasks = [asyncio.create_task(hold_connection(host, int(port), request, count, timeout, start, samples, failures))
+             for _ in range(connections)]
+    # Give the connections a moment to be accepted, then release them together
+    await asyncio.sleep(min(5.0, 0.5 + connections / 2000))
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    return samples, failures, time.perf_counter() - started
+
+
+def raise_open_file_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the WSGI and ASGI servers at thousands of open connections")
+    parser.add_argument('--servers', default='wsgi,asgi', help="Comma-separated servers to run (wsgi, asgi)")
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--requests-per-connection', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=32, help="gunicorn threads, and ASGI generator threads")
+    parser.add_argument('--backend', choices=('fake', 'template'), default='fake')
+    parser.add_argument('--latency', type=float, default=0.2, help="Fake provider latency in seconds")
+    parser.add_argument('--message', default="suggest some names for my coffee shop")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Seconds before a request counts as timed out")
+    parser.add_argument('--compare', help="Saved concurrency results JSON to compare against")
+    parser.add_argument('--output', help="Where to save results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    # Each connection needs a descriptor here and another in the server
+    limit = raise_open_file_limit(args.connections + 256)
+    if limit < args.connections + 64:
+        parser.error(f"the open file limit is {limit}; raise it (ulimit -n) or lower --connections")
+
+    env = {
+        'GENERATION_BACKEND': args.backend,
+        'FAKE_PROVIDER_LATENCY': str(args.latency),
+        'FAKE_PROVIDER_JITTER': '0',
+        # Only the servers should limit concurrency, not the model budget or admission control
+        'GENERATION_MAX_CONCURRENCY': str(args.connections),
+        'GENERATION_QUEUE_TIMEOUT': str(args.timeout),
+        'GENERATION_TIMEOUT': str(args.timeout),
+        'ADMISSION_MAX_ACTIVE': '0',
+        'RATE_LIMIT_PER_CLIENT': '0'
+    }
+    payload = {'message': args.message, 'business_idea': 'coffee shop'}
+
+    results = {}
+    for server_name in args.servers.split(','):
+        server, url = spawn_server(1, args.threads, server_name, env)
+        try:
+            samples, failures, elapsed = asyncio.run(
+                run_connections(url, payload, args.connections, args.requests_per_connection, args.timeout)
+            )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+        ok = [latency for status, latency in samples if status == 200]
+        results[server_name] = dict(
+            latency_summary(ok),
+            requests_per_second=len(ok) / elapsed,
+            non_200=len(samples) - len(ok),
+            **{f'failed_{reason}': count for reason, count in failures.items()}
+        )
+        print(f"🚀 {server_name}: {len(ok):,} ok of {args.connections * args.requests_per_connection:,} "
+              f"requests in {elapsed:.1f}s")
+
+    print(f"\n{'server':<8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'non-200':>8} {'conn fail':>10} {'timeouts':>9}")
+    for server_name, summary in results.items():
+        print(f"{server_name:<8} {summary['requests_per_second']:>9,.0f} {summary['p50_ms']:>9.1f} "
+              f"{summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f} {summary['non_200']:>8} "
+              f"{summary['failed_connect'] + summary['failed_dropped']:>10} {summary['failed_timeout']:>9}")
+
+    results['config'] = {'connections': args.connections, 'requests_per_connection': args.requests_per_connection,
+                         'threads': args.threads, 'backend': args.backend, 'latency': args.latency,
+                         'message': args.message, 'workers': 1}
+    save_results('concurrency', results, args.output)
+    if args.compare:
+        compare(args.compare, {name: value for name, value in results.items() if name != 'config'},
+                'requests_per_second', lower_is_better=False)
+
+
+if __name__ == '__main__':
+    main()
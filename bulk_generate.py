@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Bulk Generate - runs the chatbot generators over a JSONL or CSV file of business
+ideas without going through the web server.
+
+Input is read as a stream and fanned out in chunks to a process pool, with only
+a bounded number of chunks in flight, so memory stays flat however long the
+file is. Results are written to a JSONL file in input order together with a
+checkpoint, so an interrupted run continues where it stopped with --resume.
+Every row gets a seed derived from --seed and its id, or the seed in its own
+`seed` column, so reruns and resumed runs produce identical output. Names and
+ideas for a row match what /api/chat returns for the same idea and seed.
+
+    python3 bulk_generate.py ideas.csv results.jsonl --workers 8
+    python3 bulk_generate.py ideas.jsonl results.jsonl --generate names,ideas --resume
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+import time
+
+from catalog import CatalogSource, DEFAULT_CATALOG_PATH
+from chatbot import SmallBusinessChatbot
+from response_cache import normalize_idea
+from seeds import derive_seed, parse_seed, rng_for
+
+ARTIFACTS = ('steps', 'names', 'logo', 'social', 'ideas')
+PLATFORMS = ('linkedin', 'instagram', 'facebook')
+
+# One chatbot per pool process, built by the pool initializer
+_chatbot = None
+
+
+def read_rows(path):
+    """Yield (row_number, row dict) from a JSONL or CSV file without loading it whole.
+
+    A JSONL line that is not valid JSON is yielded as its ValueError, so it gets an
+    error row in the output instead of stopping the run.
+    """
+    with open(path, newline='', encoding='utf-8') as input_file:
+        if path.lower().endswith('.csv'):
+            for row_number, row in enumerate(csv.DictReader(input_file)):
+                yield row_number, row
+        else:
+            for row_number, line in enumerate(input_file):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as error:
+                    yield row_number, error
+                    continue
+                # A bare JSON string is shorthand for {"business_idea": ...}
+                yield row_number, row if isinstance(row, dict) else {'business_idea': row}
+
+
+def _init_worker(catalog_path):
+    global _chatbot
+    # No reloading mid-run, so every row of a run sees the same templates
+    _chatbot = SmallBusinessChatbot(CatalogSource(catalog_path, check_interval=0))
+
+
+def generate_row(row_number, row, options):
+    """Run the selected generators for one input row and return its result dict"""
+    business_idea = normalize_idea(str(row.get('business_idea') or row.get('idea') or ''))
+    row_id = row.get('id') or row_number
+    result = {'id': row_id, 'business_idea': business_idea}
+    if not business_idea:
+        result['error'] = "missing business_idea"
+        return result
+
+    # Depends only on the run seed and the row, never on scheduling
+    seed = parse_seed(row.get('seed'))
+    if seed is None:
+        seed = derive_seed(options['seed'], row_id)
+    category = _chatbot.categorize_business(business_idea.lower())
+    result.update(seed=seed, category=category)
+    artifacts = options['generate']
+
+    if 'names' in artifacts:
+        result['names'] = _chatbot.generate_business_names(business_idea, options['names_count'], rng_for(seed))
+    # Posts and logos use the given name, else the first suggestion
+    business_name = row.get('business_name') or (result.get('names') or [business_idea.title() + ' Business'])[0]
+    result['business_name'] = business_name
+
+    if 'steps' in artifacts:
+        result['steps'] = _chatbot.generate_business_steps('general', business_idea, category)
+    if 'logo' in artifacts:
+        result['logo_prompt'] = _chatbot.generate_logo_prompt(business_name, business_idea, category)
+    if 'social' in artifacts:
+        result['social_media'] = {
+            platform: _chatbot.generate_social_media_content(platform, business_name, business_idea)
+            for platform in options['platforms']
+        }
+    if 'ideas' in artifacts:
+        result['ideas'] = _chatbot.generate_innovative_ideas(business_idea, category, rng_for(seed))
+    return result
+
+
+def generate_chunk(rows, options):
+    """Generate a chunk of rows in a pool process; returns the JSONL text to append"""
+    lines = []
+    for row_number, row in rows:
+        if isinstance(row, ValueError):
+            lines.append(json.dumps({'id': row_number, 'error': f"malformed JSON: {row}"}, ensure_ascii=False) + "\n")
+            continue
+        try:
+            result = generate_row(row_number, row, options)
+        except Exception as error:
+            result = {'id': row.get('id') or row_number, 'error': f"{type(error).__name__}: {error}"}
+        lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+    return "".join(lines)
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Checkpoint:
+    """Rows and bytes committed to the output so far, saved next to the output file"""
+
+    def __init__(self, path, options):
+        self.path = path
+        self.options = options
+        self.rows_read = 0
+        self.rows_written = 0
+        self.output_bytes = 0
+
+    def load(self):
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+        if state['options'] != self.options:
+            raise SystemExit(
+                f"❌ {self.path} was written with different options or catalog "
+                f"({state['options']}); rerun without --resume to start over"
+            )
+        self.rows_read = state['rows_read']
+        self.rows_written = state['rows_written']
+        self.output_bytes = state['output_bytes']
+
+    def save(self):
+        state = {
+            'options': self.options,
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'output_bytes': self.output_bytes
+        }
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+
+def report_progress(checkpoint, resumed_rows, started, final=False):
+    elapsed = time.perf_counter() - started
+    rate = (checkpoint.rows_read - resumed_rows) / elapsed if elapsed else 0.0
+    line = f"🚀 {checkpoint.rows_read:,} rows done ({rate:,.0f} rows/s, {elapsed:.0f}s elapsed)"
+    if sys.stderr.isatty() and not final:
+        print(line, end="\r", file=sys.stderr, flush=True)
+    else:
+        print(line, file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate plans, names, logo prompts and posts for a file of business ideas")
+    parser.add_argument('input', help="JSONL (objects or strings) or CSV file with a business_idea column")
+    parser.add_argument('output', help="JSONL file to write one result per input row to")
+    parser.add_argument('--generate', default=','.join(ARTIFACTS),
+                        help=f"Comma-separated artifacts to generate (default: {','.join(ARTIFACTS)})")
+    parser.add_argument('--platforms', default=','.join(PLATFORMS), help="Social media platforms to write posts for")
+    parser.add_argument('--names-count', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0, help="Run seed; each row without a seed column gets one derived from it")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=200, help="Rows sent to a worker at a time")
+    parser.add_argument('--max-inflight', type=int, default=None,
+                        help="Chunks queued or running at once (default: 4 per worker)")
+    parser.add_argument('--catalog', default=os.getenv('CATALOG_PATH', DEFAULT_CATALOG_PATH))
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+
+    generate = sorted(set(args.generate.split(',')))
+    unknown = set(generate) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f"unknown artifacts: {', '.join(sorted(unknown))} (choose from {', '.join(ARTIFACTS)})")
+
+    options = {
+        'generate': generate,
+        'platforms': [platform.strip().lower() for platform in args.platforms.split(',') if platform.strip()],
+        'names_count': args.names_count,
+        'seed': args.seed,
+        'input': os.path.abspath(args.input),
+        'catalog': CatalogSource(args.catalog, check_interval=0).current().revision
+    }
+    checkpoint = Checkpoint(f"{args.output}.checkpoint", options)
+    if args.resume and os.path.exists(checkpoint.path):
+        checkpoint.load()
+        print(f"↩️  Resuming after {checkpoint.rows_read:,} rows", file=sys.stderr)
+    elif os.path.exists(checkpoint.path) and not args.resume:
+        print(f"⚠️  Ignoring {checkpoint.path}; pass --resume to continue that run", file=sys.stderr)
+
+    rows = read_rows(args.input)
+    # Skip rows the checkpoint already covers
+    for _ in range(checkpoint.rows_read):
+        next(rows, None)
+
+    max_inflight = args.max_inflight or 4 * args.workers
+    resumed_rows = checkpoint.rows_read
+    started = last_report = time.perf_counter()
+
+    with open(args.output, 'a+b') as output_file:
+        # Drop anything written after the last checkpoint by an interrupted run
+        output_file.truncate(checkpoint.output_bytes)
+        output_file.seek(checkpoint.output_bytes)
+
+        with concurrent.futures.ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                                    initargs=(args.catalog,)) as pool:
+            chunks = chunked(rows, args.chunk_size)
+            inflight = collections.deque()
+            while True:
+                while len(inflight) < max_inflight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    inflight.append((len(chunk), pool.submit(generate_chunk, chunk, options)))
+                if not inflight:
+                    break
+
+                # Write in input order so the checkpoint is a simple row count
+                row_count, future = inflight.popleft()
+                text = future.result().encode('utf-8')
+                output_file.write(text)
+                output_file.flush()
+                checkpoint.rows_read += row_count
+                checkpoint.rows_written += text.count(b"\n")
+                checkpoint.output_bytes += len(text)
+                checkpoint.save()
+
+                if time.perf_counter() - last_report >= 1:
+                    report_progress(checkpoint, resumed_rows, started)
+                    last_report = time.perf_counter()
+
+    report_progress(checkpoint, resumed_rows, started, final=True)
+    print(f"✅ Wrote {checkpoint.rows_written:,} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
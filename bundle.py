@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Static Bundle - chat replies for the most popular ideas, exported once and then
+served without running any generator.
+
+`python3 bundle.py export` builds the steps, logo, social media and seeded names
+and ideas replies for a list of top ideas, byte for byte as /api/chat would,
+and writes them twice:
+
+- a key/value file sorted by key (data/replies.bundle by default) that every
+  worker maps into memory and binary-searches, so it takes no heap and forked
+  workers share its pages;
+- one static JSON file per reply under public/replies/, with an index.json, for
+  serving from a CDN or any static file server.
+
+Keys are the app's response cache keys, which carry the catalog revision, so a
+bundle exported from another catalog is never served.
+
+    python3 bundle.py export --ideas data/top_ideas.jsonl --seeds 8
+    python3 bundle.py info
+"""
+
+import argparse
+import collections
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'replies.bundle')
+DEFAULT_PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public', 'replies')
+DEFAULT_IDEAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'top_ideas.jsonl')
+
+MAGIC = b'SBRB'
+FORMAT_VERSION = 1
+# magic, format version, entry count, metadata length; then the metadata JSON,
+# the index of (key offset, key length, value offset, value length) sorted by
+# key, and the keys and values themselves
+HEADER = struct.Struct('<4sIIQ')
+ENTRY = struct.Struct('<QIQI')
+
+
+class BundleError(Exception):
+    pass
+
+
+def write_bundle(path, items, metadata):
+    """Write {key bytes: value bytes} sorted by key, replacing path atomically"""
+    keys = sorted(items)
+    meta = json.dumps(metadata, sort_keys=True).encode('utf-8')
+    offset = HEADER.size + len(meta) + ENTRY.size * len(keys)
+    entries, chunks = [], []
+    for key in keys:
+        value = items[key]
+        entries.append(ENTRY.pack(offset, len(key), offset + len(key), len(value)))
+        chunks += [key, value]
+        offset += len(key) + len(value)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as bundle_file:
+        bundle_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), len(meta)))
+        bundle_file.write(meta)
+        bundle_file.write(b''.join(entries))
+        bundle_file.writelines(chunks)
+    os.replace(temporary_path, path)
+
+
+class StaticBundle:
+    """A bundle file mapped read-only into memory"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as bundle_file:
+            self._map = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise BundleError(f"{path} is too short to be a bundle")
+        magic, version, self.count, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise BundleError(f"{path} is not a version {FORMAT_VERSION} reply bundle")
+        self._index = HEADER.size + meta_length
+        if self._index + ENTRY.size * self.count > len(self._map):
+            raise BundleError(f"{path} is truncated")
+
+        self.metadata = json.loads(self._map[HEADER.size:self._index])
+        self.revision = self.metadata.get('revision')
+        self.seeds = tuple(self.metadata.get('seeds', ()))
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._map, self._index + position * ENTRY.size)
+
+    def _find(self, key):
+        """Binary search of the sorted index; returns the entry for key, or None"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length, _, _ = self._entry(middle)
+            if self._map[key_offset:key_offset + key_length] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            entry = self._entry(low)
+            if self._map[entry[0]:entry[0] + entry[1]] == key:
+                return entry
+        return None
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def get(self, key):
+        """Return the value stored under key (bytes), or None"""
+        entry = self._find(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._map[entry[2]:entry[2] + entry[3]]
+
+    def keys(self):
+        for position in range(self.count):
+            key_offset, key_length, _, _ = self._entry(position)
+            yield self._map[key_offset:key_offset + key_length]
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'revision': self.revision,
+            'entries': self.count,
+            'bytes': len(self._map),
+            'seeds': len(self.seeds),
+            'ideas': self.metadata.get('ideas'),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class BundleSource:
+    """Serves the current bundle, if the file exists, reopening it when it changes"""
+
+    def __init__(self, path=DEFAULT_BUNDLE_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._bundle = None
+        self._next_check = 0.0
+        if path:
+            self._maybe_reload()
+
+    def current(self):
+        """Return the latest bundle or None; the file is stat'ed at most once per check interval"""
+        if self.path and self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._bundle
+
+    def _maybe_reload(self):
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                bundle = StaticBundle(self.path)
+            except (OSError, ValueError, BundleError) as error:
+                self.reload_errors += 1
+                logger.error("Keeping the current bundle: opening %s failed: %s", self.path, error)
+                return
+            # The old mapping is closed once no request holds it any more
+            self._bundle = bundle
+            self.reloads += 1
+            logger.info("Loaded %s bundled replies for catalog %s from %s", bundle.count, bundle.revision, self.path)
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        stats = {'path': self.path, 'loaded': self._bundle is not None,
+                 'reloads': self.reloads, 'reload_errors': self.reload_errors}
+        if self._bundle is not None:
+            stats.update(self._bundle.stats())
+        return stats
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'x'
+
+
+def reply_path(cache_key, disambiguate=False):
+    """Relative static file path of a reply, built from its cache key"""
+    intent, _, business_idea, *rest = cache_key
+    parts = [intent] + [slug(part) for part in rest if part is not None]
+    if disambiguate:
+        parts.append(hashlib.sha256(json.dumps(cache_key).encode('utf-8')).hexdigest()[:8])
+    return f"{slug(business_idea)}/{'-'.join(parts)}.json"
+
+
+def reply_paths(cache_keys):
+    """{cache_key: path} for a set of replies; keys whose slugs collide (say 'Bean There!' and
+    'bean there') each get a short hash of the whole key, so no reply overwrites another"""
+    counts = collections.Counter(reply_path(cache_key) for cache_key in cache_keys)
+    return {cache_key: reply_path(cache_key, counts[reply_path(cache_key)] > 1) for cache_key in cache_keys}
+
+
+def export_replies(entries, seeds, platforms):
+    """Yield (cache_key, body) for every bundled reply, built as /api/chat builds it"""
+    from app import chat_response, chatbot, plan_intent, run_generator, serialize_response
+    from response_cache import normalize_idea
+
+    seen = set()
+    for entry in entries:
+        business_idea = normalize_idea(str(entry.get('business_idea') or ''))
+        if not business_idea:
+            continue
+        business_name = entry.get('business_name') or None
+        category, provisional = chatbot.categorize_business_with_status(business_idea.lower())
+        if provisional:
+            # The app would look these replies up under the model's category, not the stand-in
+            logger.warning("Skipping %r: the categorizer did not answer in time", business_idea)
+            continue
+
+        plans = [('steps', None, None, None), ('logo', None, business_name, None)]
+        plans += [('social_media', platform, business_name, None) for platform in platforms]
+        plans += [(intent, None, None, seed) for intent in ('names', 'ideas') for seed in seeds]
+        for intent, platform, name, seed in plans:
+            cache_key, response_type, header, produce, seed = plan_intent(
+                intent, platform or 'linkedin', business_idea, name, category, seed
+            )
+            # Text replies, and model-written names, have no fixed body to bundle
+            if cache_key is None or produce is None or cache_key in seen:
+                continue
+            seen.add(cache_key)
+            data, fell_back = run_generator(response_type, produce)
+            if fell_back:
+                logger.warning("Skipping %s: the model gave no answer and the template was used", cache_key)
+                continue
+            yield cache_key, serialize_response(chat_response(header, response_type, data, seed))
+
+
+def write_public_files(public_dir, replies, metadata):
+    """Write one JSON file per reply plus index.json, swapping the whole directory in at once"""
+    staging_dir = f"{public_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    index = dict(metadata, ideas={})
+    paths = reply_paths([cache_key for cache_key, _ in replies])
+    for cache_key, body in replies:
+        path = paths[cache_key]
+        os.makedirs(os.path.join(staging_dir, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(staging_dir, path), 'wb') as reply_file:
+            reply_file.write(body)
+        index['ideas'].setdefault(cache_key[2], {})[os.path.basename(path)[:-len('.json')]] = path
+    with open(os.path.join(staging_dir, 'index.json'), 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, indent=2, sort_keys=True, ensure_ascii=False)
+
+    if os.path.isdir(public_dir):
+        if not os.path.exists(os.path.join(public_dir, 'index.json')):
+            shutil.rmtree(staging_dir)
+            raise SystemExit(f"❌ {public_dir} exists and was not written by an export; pick another --public-dir")
+        retired_dir = f"{public_dir}.{os.getpid()}.old"
+        os.replace(public_dir, retired_dir)
+        os.replace(staging_dir, public_dir)
+        shutil.rmtree(retired_dir)
+    else:
+        os.replace(staging_dir, public_dir)
+
+
+def export(args):
+    from bulk_generate import read_rows
+    from seeds import derive_seed
+
+    # Malformed lines come back as their ValueError
+    entries = [row for _, row in read_rows(args.ideas) if isinstance(row, dict)]
+    seeds = [derive_seed(args.seed, 'bundle', index) for index in range(args.seeds)]
+
+    from app import chatbot
+    catalog = chatbot.catalog
+    platforms = [platform.strip().lower() for platform in args.platforms.split(',') if platform.strip()] \
+        if args.platforms else sorted(catalog.social_templates)
+    if chatbot.backend is not None:
+        print("⚠️  A generation backend is configured; model-written names are not bundled", file=sys.stderr)
+
+    started = time.perf_counter()
+    replies = list(export_replies(entries, seeds, platforms))
+    metadata = {
+        'revision': catalog.revision,
+        'catalog_version': catalog.version,
+        'seeds': seeds,
+        'platforms': platforms,
+        'ideas': len({cache_key[2] for cache_key, _ in replies})
+    }
+    write_bundle(args.output, {json.dumps(cache_key).encode('utf-8'): body for cache_key, body in replies}, metadata)
+    print(f"✅ Bundled {len(replies):,} replies for {metadata['ideas']} ideas into {args.output} "
+          f"({os.path.getsize(args.output) / 1024:,.0f} KiB, {time.perf_counter() - started:.1f}s)")
+    if args.public_dir:
+        write_public_files(args.public_dir, replies, metadata)
+        print(f"✅ Wrote static JSON replies to {args.public_dir}/")
+
+
+def info(args):
+    bundle = StaticBundle(args.bundle)
+    print(json.dumps(dict(bundle.stats(), platforms=bundle.metadata.get('platforms'),
+                          catalog_version=bundle.metadata.get('catalog_version')), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and inspect the static bundle of precomputed chat replies")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subcommands.add_parser('export', help="Precompute replies for a list of top ideas")
+    export_parser.add_argument('--ideas', default=DEFAULT_IDEAS_PATH,
+                               help="JSONL (strings or objects with business_idea and business_name) or CSV of ideas")
+    export_parser.add_argument('--seeds', type=int, default=8, help="Seeded names and ideas replies per idea")
+    export_parser.add_argument('--seed', type=int, default=0, help="Seed the bundled seeds are derived from")
+    export_parser.add_argument('--platforms', default='', help="Social media platforms (default: every catalog template)")
+    export_parser.add_argument('--output', default=os.getenv('STATIC_BUNDLE_PATH') or DEFAULT_BUNDLE_PATH)
+    export_parser.add_argument('--public-dir', default=DEFAULT_PUBLIC_DIR, help="Where to write static JSON ('' to skip)")
+
+    info_parser = subcommands.add_parser('info', help="Describe an exported bundle")
+    info_parser.add_argument('bundle', nargs='?', default=os.getenv('STATIC_BUNDLE_PATH') or DEFAULT_BUNDLE_PATH)
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export(args)
+    else:
+        info(args)
+
+
+if __name__ == '__main__':
+    main()
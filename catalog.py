@@ -0,0 +1,193 @@
+"""
+Template Catalog - the categories, steps, name vocabularies, logo styles, idea
+lists and social post templates the chatbot answers from, kept in a versioned
+JSON file (data/catalog.json) so content can change without a code change.
+
+The file is parsed once into an immutable snapshot: tuples of interned strings,
+per-category step variants and idea pools built ahead of time, and the intent
+router and name generator compiled for its vocabulary. CatalogSource swaps in a
+new snapshot when the file changes, so running workers pick up edits without a
+restart.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+from intent_router import IntentRouter, INTENT_RULES, PLATFORM_RULES
+from name_generator import NameGenerator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalog.json')
+
+RESTAURANT_MARKETING_NOTE = " (focus on food photography and reviews)"
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def _strings(values, field, intern=False):
+    if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+        raise CatalogError(f"'{field}' must be a list of strings")
+    return tuple(sys.intern(value) if intern else value for value in values)
+
+
+def _customize_step(step, restaurant, online):
+    """Tailor one step to a restaurant or online business idea"""
+    if restaurant and "menu" not in step:
+        if "marketing" in step.lower():
+            return step + RESTAURANT_MARKETING_NOTE
+        return step
+    elif online:
+        if "location" in step.lower():
+            return step.replace("location", "e-commerce platform and website")
+    return step
+
+
+class Catalog:
+    """One immutable, fully precomputed snapshot of the catalog file"""
+
+    def __init__(self, data, revision):
+        if data.get('schema_version') != SCHEMA_VERSION:
+            raise CatalogError(f"Unsupported catalog schema_version {data.get('schema_version')!r}, expected {SCHEMA_VERSION}")
+        categories = data.get('categories')
+        if not isinstance(categories, dict) or not categories:
+            raise CatalogError("'categories' must be a non-empty object")
+
+        self.version = str(data.get('version', '0'))
+        self.revision = revision
+        self.default_category = sys.intern(data.get('default_category', 'service'))
+        if self.default_category not in categories:
+            raise CatalogError(f"default_category '{self.default_category}' is not defined in 'categories'")
+        self.default_logo_style = data.get('default_logo_style', "professional and modern")
+        common_ideas = _strings(data.get('common_ideas', []), 'common_ideas')
+
+        steps, logo_styles, idea_pools, exemplars, category_rules = {}, {}, {}, {}, []
+        for name, category in categories.items():
+            if not isinstance(category, dict):
+                raise CatalogError(f"categories.{name} must be an object")
+            name = sys.intern(name)
+            keywords = _strings(category.get('keywords', []), f'categories.{name}.keywords', intern=True)
+            if keywords:
+                category_rules.append((name, [keywords]))
+            # Example ideas that describe the category for semantic matching
+            exemplars[name] = _strings(category.get('exemplars', []), f'categories.{name}.exemplars')
+
+            # Every (restaurant idea, online idea) combination of the steps, so a
+            # request only picks a variant instead of rewriting each step
+            base_steps = _strings(category.get('steps'), f'categories.{name}.steps')
+            steps[name] = MappingProxyType({
+                (restaurant, online): tuple(_customize_step(step, restaurant, online) for step in base_steps)
+                for restaurant in (False, True) for online in (False, True)
+            })
+            logo_styles[name] = category.get('logo_style', self.default_logo_style)
+            idea_pools[name] = common_ideas + _strings(category.get('ideas', []), f'categories.{name}.ideas')
+
+        self.categories = tuple(steps)
+        self.steps = MappingProxyType(steps)
+        self.logo_styles = MappingProxyType(logo_styles)
+        self.idea_pools = MappingProxyType(idea_pools)
+        self.exemplars = MappingProxyType(exemplars)
+        self.category_keywords = tuple((name, groups[0]) for name, groups in category_rules)
+        self.common_ideas = common_ideas
+
+        names = data.get('names', {})
+        self.name_prefixes = _strings(names.get('prefixes'), 'names.prefixes', intern=True)
+        self.funny_adjectives = _strings(names.get('adjectives'), 'names.adjectives', intern=True)
+        self.name_suffixes = _strings(names.get('suffixes'), 'names.suffixes', intern=True)
+
+        templates = {}
+        for platform, template in data.get('social_templates', {}).items():
+            try:
+                templates[sys.intern(platform.lower())] = (template['format'], template['template'])
+            except (TypeError, KeyError):
+                raise CatalogError(f"social_templates.{platform} needs a 'format' and a 'template'") from None
+        self.social_templates = MappingProxyType(templates)
+
+        self.router = IntentRouter(INTENT_RULES, PLATFORM_RULES, category_rules, self.default_category)
+        self.name_generator = NameGenerator(self.name_prefixes, self.funny_adjectives, self.name_suffixes)
+
+    def steps_for(self, business_category, business_idea):
+        """Return the step list of a category, tailored to a lowercased business idea"""
+        variants = self.steps.get(business_category) or self.steps[self.default_category]
+        online = "online" in business_idea or "e-commerce" in business_idea
+        return variants[("restaurant" in business_idea, online)]
+
+
+def load_catalog(path=DEFAULT_CATALOG_PATH):
+    """Parse and precompute a catalog file, raising CatalogError when it is invalid"""
+    with open(path, 'rb') as catalog_file:
+        raw = catalog_file.read()
+    try:
+        data = json.loads(raw)
+    except ValueError as error:
+        raise CatalogError(f"{path} is not valid JSON: {error}") from error
+    if not isinstance(data, dict):
+        raise CatalogError(f"{path} must hold a JSON object")
+    # The content hash changes with any edit, even when the version is not bumped
+    return Catalog(data, revision=f"{data.get('version', '0')}+{hashlib.sha256(raw).hexdigest()[:12]}")
+
+
+class CatalogSource:
+    """Serves the current catalog snapshot, reloading it when the file changes"""
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        self._catalog = load_catalog(path)
+        self._next_check = time.monotonic() + check_interval
+
+    def current(self):
+        """Return the latest catalog; the file is stat'ed at most once per check interval"""
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._catalog
+
+    def _maybe_reload(self):
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already checking; keep serving the current snapshot
+            return
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            try:
+                catalog = load_catalog(self.path)
+            except (OSError, CatalogError) as error:
+                # A half-saved or broken file must not take the chatbot down
+                self.reload_errors += 1
+                logger.error("Keeping catalog %s: reloading %s failed: %s", self._catalog.revision, self.path, error)
+                return
+            self._catalog = catalog
+            self.reloads += 1
+            logger.info("Loaded catalog %s from %s", catalog.revision, self.path)
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'version': self._catalog.version,
+            'revision': self._catalog.revision,
+            'categories': list(self._catalog.categories),
+            'check_interval': self.check_interval,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors
+        }
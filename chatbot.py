@@ -0,0 +1,164 @@
+"""
+Small Business Chatbot - the generators behind every chat reply, shared by the
+Flask app and the standalone demo. All content comes from the template catalog.
+"""
+
+import random
+import re
+
+from catalog import CatalogSource
+
+
+class SmallBusinessChatbot:
+    def __init__(self, catalog_source=None, backend=None, categorizer=None):
+        # Optional model-backed generation; the catalog templates remain the fallback
+        self.backend = backend
+        self.catalog_source = catalog_source or CatalogSource()
+        # Optional semantic categorizer; the keyword router is used without one
+        self.categorizer = categorizer
+
+    @property
+    def catalog(self):
+        """The current catalog snapshot; read it once per call so a reload never mixes versions"""
+        return self.catalog_source.current()
+
+    @property
+    def router(self):
+        return self.catalog.router
+
+    @property
+    def name_generator(self):
+        return self.catalog.name_generator
+
+    @property
+    def social_templates(self):
+        return self.catalog.social_templates
+
+    @property
+    def name_prefixes(self):
+        return self.catalog.name_prefixes
+
+    @property
+    def name_suffixes(self):
+        return self.catalog.name_suffixes
+
+    @property
+    def funny_adjectives(self):
+        return self.catalog.funny_adjectives
+
+    def generate_business_steps(self, business_type, business_idea, business_category=None):
+        """Generate customized business steps based on the business idea"""
+        catalog = self.catalog
+        if business_category is None:
+            business_category = self.categorize_business(business_idea.lower())
+        return list(catalog.steps_for(business_category, business_idea.lower()))
+
+    def categorize_business(self, business_idea):
+        """Categorize business idea into predefined categories"""
+        return self.categorize_business_with_status(business_idea)[0]
+
+    def categorize_business_with_status(self, business_idea):
+        """Return (category, provisional); provisional when a timed-out categorizer fell back to keywords"""
+        if self.categorizer is not None:
+            return self.categorizer.categorize_with_status(business_idea)
+        return self.router.categorize(business_idea), False
+
+    def _names_prompt(self, business_idea, count):
+        return (
+            f"Suggest {count} creative, catchy and slightly humorous names for a {business_idea} business. "
+            "Reply with one name per line and nothing else."
+        )
+
+    @staticmethod
+    def _parse_names(text, count):
+        # Drop list markers such as "1." or "-" the model may prefix lines with
+        names = [re.sub(r'^\s*(?:[-•*]|\d+[.)])\s*', '', line).strip().strip('"') for line in (text or "").splitlines()]
+        return [name for name in names if name][:count]
+
+    def generate_business_names(self, business_idea, count=5, rng=None):
+        """Generate creative and humorous business names"""
+        if self.backend is not None:
+            names = self._parse_names(self.backend.complete(self._names_prompt(business_idea, count)), count)
+            if names:
+                return names
+
+        return self.name_generator.generate(business_idea, count, rng)
+
+    async def generate_business_names_async(self, business_idea, count=5, rng=None):
+        """generate_business_names for callers on an event loop; the model call is awaited, not blocked on"""
+        if self.backend is not None:
+            names = self._parse_names(await self.backend.complete_async(self._names_prompt(business_idea, count)), count)
+            if names:
+                return names
+
+        return self.name_generator.generate(business_idea, count, rng)
+
+    def generate_logo_prompt(self, business_name, business_idea, business_category=None):
+        """Generate a detailed prompt for logo creation"""
+        catalog = self.catalog
+        if business_category is None:
+            business_category = self.categorize_business(business_idea.lower())
+
+        style = catalog.logo_styles.get(business_category, catalog.default_logo_style)
+
+        return f"Create a professional logo for '{business_name}', a {business_idea} business. Style: {style}. The logo should be memorable, scalable, and work well in both color and black & white."
+
+    def _social_prompt(self, post_format, business_name, business_idea):
+        return (
+            f"Write a {post_format} announcing {business_name}, a new {business_idea} business. "
+            "Use emojis and end with relevant hashtags."
+        )
+
+    def _social_template_post(self, template, business_name, business_idea):
+        if template is None:
+            return {"format": "General Social Media", "content": f"Check out {business_name} for amazing {business_idea}!"}
+
+        post_format, content = template
+        return {
+            "format": post_format,
+            "content": content.format(
+                business_name=business_name,
+                business_idea=business_idea,
+                business_tag=business_name.replace(' ', '')
+            )
+        }
+
+    def social_media_post(self, platform, business_name, business_idea):
+        """Return (post, fell_back); fell_back is True when the model gave no answer and the template was used"""
+        template = self.social_templates.get(platform.lower())
+        if template is not None and self.backend is not None:
+            text = self.backend.complete(self._social_prompt(template[0], business_name, business_idea))
+            if text:
+                return {"format": template[0], "content": text.strip()}, False
+            return self._social_template_post(template, business_name, business_idea), True
+
+        return self._social_template_post(template, business_name, business_idea), False
+
+    async def social_media_post_async(self, platform, business_name, business_idea):
+        """social_media_post for callers on an event loop"""
+        template = self.social_templates.get(platform.lower())
+        if template is not None and self.backend is not None:
+            text = await self.backend.complete_async(self._social_prompt(template[0], business_name, business_idea))
+            if text:
+                return {"format": template[0], "content": text.strip()}, False
+            return self._social_template_post(template, business_name, business_idea), True
+
+        return self._social_template_post(template, business_name, business_idea), False
+
+    def generate_social_media_content(self, platform, business_name, business_idea):
+        """Generate social media content for different platforms"""
+        return self.social_media_post(platform, business_name, business_idea)[0]
+
+    async def generate_social_media_content_async(self, platform, business_name, business_idea):
+        """generate_social_media_content for callers on an event loop"""
+        return (await self.social_media_post_async(platform, business_name, business_idea))[0]
+
+    def generate_innovative_ideas(self, business_idea, business_category=None, rng=None):
+        """Generate innovative ideas related to the business"""
+        catalog = self.catalog
+        if business_category is None:
+            business_category = self.categorize_business(business_idea.lower())
+
+        # Pools of the shared ideas plus each category's own are built when the catalog loads
+        ideas = catalog.idea_pools.get(business_category, catalog.common_ideas)
+        return (rng or random).sample(ideas, min(6, len(ideas)))
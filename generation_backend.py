@@ -0,0 +1,240 @@
+"""
+Generation Backend - runs model provider calls on a shared asyncio loop so a
+Flask worker never blocks on an SDK call for longer than the configured budget.
+When a call times out, errors or cannot get a concurrency slot, callers get
+None back and fall back to the template generators.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import logging
+import os
+import random
+import threading
+import time
+
+from optional_deps import require
+
+logger = logging.getLogger(__name__)
+
+
+class FakeProvider:
+    """Offline provider with a fixed latency plus jitter, for throughput and tail-latency testing"""
+    name = 'fake'
+
+    def __init__(self, latency=0.2, jitter=0.1, reply=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.reply = reply
+
+    async def complete(self, prompt, max_tokens):
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.reply is not None:
+            return self.reply
+        return "\n".join(f"Fake Reply {index + 1}" for index in range(5))
+
+
+class OpenAIProvider:
+    name = 'openai'
+
+    def __init__(self, api_key, model='gpt-3.5-turbo', http_client=None):
+        openai = require('openai', "The OpenAI generation backend")
+        # Retries are disabled because the backend enforces its own time budget
+        self.client = openai.AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+        self.model = model
+
+    async def complete(self, prompt, max_tokens):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{'role': 'user', 'content': prompt}],
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+
+class AnthropicProvider:
+    name = 'anthropic'
+
+    def __init__(self, api_key, model='claude-2.1', http_client=None):
+        anthropic = require('anthropic', "The Anthropic generation backend")
+        self.client = anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, max_retries=0)
+        self.model = model
+        self.human_prompt = anthropic.HUMAN_PROMPT
+        self.ai_prompt = anthropic.AI_PROMPT
+
+    async def complete(self, prompt, max_tokens):
+        response = await self.client.completions.create(
+            model=self.model,
+            prompt=f"{self.human_prompt} {prompt}{self.ai_prompt}",
+            max_tokens_to_sample=max_tokens
+        )
+        return response.completion
+
+
+def pooled_http_client(max_connections, timeout):
+    """Create the keep-alive HTTP client shared by every call of a provider"""
+    httpx = require('httpx', "Model-backed generation")
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=timeout
+    )
+
+
+class GenerationBackend:
+    def __init__(self, provider_factory, timeout=5.0, max_concurrency=16, queue_timeout=0.05):
+        self.provider_factory = provider_factory
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+
+        self.calls = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rejected = 0
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._provider = None
+        self._semaphore = None
+
+    def _ensure_loop(self):
+        """Start the event loop thread on first use, and again in each forked worker"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='generation-backend', daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop = loop
+                self._pid = os.getpid()
+            return self._loop
+
+    async def _setup(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._provider = self.provider_factory()
+
+    async def _complete(self, prompt, max_tokens):
+        self.calls += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return None
+
+        try:
+            text = await asyncio.wait_for(self._provider.complete(prompt, max_tokens), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        except Exception:
+            self.errors += 1
+            logger.exception("Generation provider call failed")
+            return None
+        finally:
+            self._semaphore.release()
+
+        self.completed += 1
+        return text
+
+    def complete(self, prompt, max_tokens=256):
+        """Run a provider call from a synchronous worker; returns None when the budget is exceeded"""
+        future = asyncio.run_coroutine_threadsafe(self._complete(prompt, max_tokens), self._ensure_loop())
+        try:
+            return future.result(self.queue_timeout + self.timeout + 1)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return None
+
+    async def complete_async(self, prompt, max_tokens=256):
+        """Awaitable variant of complete() for callers running on their own event loop"""
+        future = asyncio.run_coroutine_threadsafe(self._complete(prompt, max_tokens), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        return {
+            'provider': getattr(self._provider, 'name', None),
+            'max_concurrency': self.max_concurrency,
+            'timeout': self.timeout,
+            'calls': self.calls,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'rejected': self.rejected
+        }
+
+
+def backend_from_env():
+    """Build the backend selected by GENERATION_BACKEND, or None to use the templates only"""
+    name = os.getenv('GENERATION_BACKEND', '').lower()
+    if name in ('', 'template'):
+        return None
+
+    timeout = float(os.getenv('GENERATION_TIMEOUT', '5'))
+    max_concurrency = int(os.getenv('GENERATION_MAX_CONCURRENCY', '16'))
+
+    if name == 'fake':
+        latency = float(os.getenv('FAKE_PROVIDER_LATENCY', '0.2'))
+        jitter = float(os.getenv('FAKE_PROVIDER_JITTER', '0.1'))
+        factory = lambda: FakeProvider(latency=latency, jitter=jitter)
+    elif name == 'openai':
+        factory = lambda: OpenAIProvider(
+            os.getenv('OPENAI_API_KEY'),
+            model=os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'),
+            http_client=pooled_http_client(max_concurrency, timeout)
+        )
+    elif name == 'anthropic':
+        factory = lambda: AnthropicProvider(
+            os.getenv('ANTHROPIC_API_KEY'),
+            model=os.getenv('ANTHROPIC_MODEL', 'claude-2.1'),
+            http_client=pooled_http_client(max_concurrency, timeout)
+        )
+    else:
+        raise ValueError(f"Unknown GENERATION_BACKEND '{name}' (expected template, fake, openai or anthropic)")
+
+    return GenerationBackend(factory, timeout=timeout, max_concurrency=max_concurrency,
+                             queue_timeout=float(os.getenv('GENERATION_QUEUE_TIMEOUT', '0.05')))
+
+
+def main():
+    """Drive the fake provider from many threads and report throughput and tail latency"""
+    parser = argparse.ArgumentParser(description="Load test the generation backend with the fake provider")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--timeout', type=float, default=0.5)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--jitter', type=float, default=0.4)
+    args = parser.parse_args()
+
+    backend = GenerationBackend(
+        lambda: FakeProvider(latency=args.latency, jitter=args.jitter),
+        timeout=args.timeout,
+        max_concurrency=args.concurrency,
+        queue_timeout=args.timeout
+    )
+
+    def timed_call(_):
+        start = time.perf_counter()
+        text = backend.complete("benchmark prompt")
+        return time.perf_counter() - start, text is None
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(timed_call, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    fallbacks = sum(1 for _, fell_back in results if fell_back)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"🚀 {args.requests} calls in {elapsed:.2f}s ({args.requests / elapsed:.1f} calls/s)")
+    print(f"⏱️  p50 {percentile(50):.0f}ms  p95 {percentile(95):.0f}ms  p99 {percentile(99):.0f}ms")
+    print(f"↩️  {fallbacks} fell back to templates ({backend.stats()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Intent Router - compiles every keyword the chatbot reacts to into a single
+matcher so a message is scanned once instead of once per if/elif branch.
+"""
+
+import re
+
+# Rules are checked in order, first match wins. Each rule is a list of keyword
+# groups and matches when every group has at least one keyword in the text.
+INTENT_RULES = [
+    ("steps", [["steps", "plan", "how to start"]]),
+    ("names", [["name"], ["suggest", "generate"]]),
+    ("logo", [["logo"]]),
+    ("social_media", [["linkedin", "instagram", "facebook", "social media"]]),
+    ("ideas", [["ideas", "innovative", "suggestions"]]),
+]
+
+PLATFORM_RULES = [
+    ("linkedin", [["linkedin"]]),
+    ("instagram", [["instagram"]]),
+    ("facebook", [["facebook"]]),
+]
+
+CATEGORY_RULES = [
+    ("restaurant", [["restaurant", "cafe", "food", "bakery", "bar"]]),
+    ("retail", [["retail", "store", "shop", "boutique", "selling"]]),
+    ("tech", [["app", "software", "tech", "website", "platform"]]),
+]
+
+
+def _trie_pattern(keywords):
+    """Build a regex alternation shaped like a trie of the keywords"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return emit(trie)
+
+
+class IntentRouter:
+    def __init__(self, intent_rules=INTENT_RULES, platform_rules=PLATFORM_RULES,
+                 category_rules=CATEGORY_RULES, default_category="service"):
+        self.default_category = default_category
+        self.intent_rules = self._freeze(intent_rules)
+        self.platform_rules = self._freeze(platform_rules)
+        self.category_rules = self._freeze(category_rules)
+
+        keywords = set()
+        for rules in (self.intent_rules, self.platform_rules, self.category_rules):
+            for _, groups in rules:
+                for group in groups:
+                    keywords.update(group)
+
+        # The lookahead lets matches overlap, the trie makes the longest keyword
+        # win at each position, and the closure below restores any shorter
+        # keywords hidden inside it ("suggestions" also contains "suggest").
+        self._matcher = re.compile("(?=(" + _trie_pattern(keywords) + "))")
+        self._contains = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in keywords
+        }
+
+    @staticmethod
+    def _freeze(rules):
+        return tuple((name, tuple(frozenset(group) for group in groups)) for name, groups in rules)
+
+    @staticmethod
+    def _first_match(found, rules):
+        for name, groups in rules:
+            if all(not found.isdisjoint(group) for group in groups):
+                return name
+        return None
+
+    def scan(self, text):
+        """Return every registered keyword that occurs in the (lowercased) text"""
+        found = set()
+        for match in self._matcher.finditer(text):
+            found.update(self._contains[match.group(1)])
+        return found
+
+    def classify(self, message):
+        """Return (intent, platform) for a lowercased chat message; intent is None when nothing matches"""
+        found = self.scan(message)
+        intent = self._first_match(found, self.intent_rules)
+        platform = self._first_match(found, self.platform_rules) or "linkedin"
+        return intent, platform
+
+    def categorize(self, business_idea):
+        """Return the business category for a lowercased business idea"""
+        return self._first_match(self.scan(business_idea), self.category_rules) or self.default_category
@@ -0,0 +1,184 @@
+"""
+Logo Renderer - turns logo prompts into PNGs in a background process pool.
+
+Images live in a content-addressed cache on disk keyed by the hash of
+(model, seed, size, prompt). The hash doubles as the job id, so identical
+requests share one render and are free once it has finished.
+"""
+
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from optional_deps import require
+
+# Pipelines are loaded once per pool process and reused for every job it runs
+_pipelines = {}
+
+
+def render_key(prompt, seed, model, size):
+    """Return the content address of a render"""
+    return hashlib.sha256(f"{model or 'procedural'}\0{seed}\0{size}\0{prompt}".encode('utf-8')).hexdigest()
+
+
+def _render_diffusion(prompt, seed, model, size, steps):
+    torch = require('torch', "Diffusion logo rendering")
+    diffusers = require('diffusers', "Diffusion logo rendering")
+
+    pipeline = _pipelines.get(model)
+    if pipeline is None:
+        pipeline = diffusers.AutoPipelineForText2Image.from_pretrained(model, torch_dtype=torch.float32)
+        pipeline.to('cpu')
+        pipeline.set_progress_bar_config(disable=True)
+        _pipelines[model] = pipeline
+
+    generator = torch.Generator('cpu').manual_seed(seed)
+    return pipeline(prompt, num_inference_steps=steps, generator=generator, height=size, width=size).images[0]
+
+
+def _render_procedural(prompt, seed, size):
+    """Draw a deterministic badge with the business initials when no model is configured"""
+    Image = require('PIL.Image', "Logo rendering")
+    ImageDraw = require('PIL.ImageDraw', "Logo rendering")
+    ImageFont = require('PIL.ImageFont', "Logo rendering")
+
+    digest = hashlib.sha256(f"{seed}\0{prompt}".encode('utf-8')).digest()
+    background = tuple(200 + byte % 56 for byte in digest[0:3])
+    primary = tuple(40 + byte % 150 for byte in digest[3:6])
+    accent = tuple(80 + byte % 176 for byte in digest[6:9])
+
+    # Prompts from generate_logo_prompt quote the business name
+    quoted = re.search(r"'([^']+)'", prompt)
+    name = quoted.group(1) if quoted else prompt
+    initials = "".join(word[0] for word in name.split() if word[:1].isalnum())[:3].upper() or "?"
+
+    image = Image.new('RGB', (size, size), background)
+    draw = ImageDraw.Draw(image)
+    margin = size // 8
+    if digest[9] % 2:
+        draw.ellipse([margin, margin, size - margin, size - margin], fill=primary, outline=accent, width=size // 40)
+    else:
+        draw.rounded_rectangle([margin, margin, size - margin, size - margin], radius=size // 6,
+                               fill=primary, outline=accent, width=size // 40)
+
+    # The bundled bitmap font is tiny, so draw the initials small and scale them up
+    font = ImageFont.load_default()
+    left, top, right, bottom = draw.textbbox((0, 0), initials, font=font)
+    text = Image.new('L', (right - left + 2, bottom - top + 2), 0)
+    ImageDraw.Draw(text).text((1 - left, 1 - top), initials, fill=255, font=font)
+    scale = (size - 3 * margin) / max(text.width, text.height)
+    text = text.resize((int(text.width * scale), int(text.height * scale)), Image.NEAREST)
+    image.paste(Image.new('RGB', text.size, background), ((size - text.width) // 2, (size - text.height) // 2), text)
+    return image
+
+
+def render_logo(prompt, seed, model, size, steps, path):
+    """Render one logo to path; runs inside a pool process"""
+    if model:
+        image = _render_diffusion(prompt, seed, model, size, steps)
+    else:
+        image = _render_procedural(prompt, seed, size)
+
+    # Write then rename so readers never see a partial file
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    image.save(temporary_path, 'PNG')
+    os.replace(temporary_path, path)
+    return path
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class LogoRenderer:
+    def __init__(self, cache_dir, model=None, max_workers=1, max_pending=32, size=512, steps=4):
+        self.cache_dir = cache_dir
+        self.model = model
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.size = size
+        self.steps = steps
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}
+        self._failures = OrderedDict()
+
+    def _get_executor(self):
+        # Created on first use so it is never inherited across a fork, and spawned
+        # so pool processes don't start from a copy of a threaded web worker
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def path_for(self, job_id):
+        return os.path.join(self.cache_dir, f"{job_id}.png")
+
+    def submit(self, prompt, seed=0, retry=False):
+        """Queue a render unless it is cached, in flight or failed; returns the job status.
+
+        A failed render is reported as failed until it is submitted again with retry=True.
+        """
+        job_id = render_key(prompt, seed, self.model, self.size)
+        if os.path.exists(self.path_for(job_id)):
+            return self.status(job_id)
+
+        future = None
+        with self._lock:
+            if job_id not in self._jobs and (retry or job_id not in self._failures):
+                pending = sum(1 for future in self._jobs.values() if not future.done())
+                if pending >= self.max_pending:
+                    raise RenderQueueFull(f"{pending} logo renders are already queued")
+
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._failures.pop(job_id, None)
+                arguments = (render_logo, prompt, seed, self.model, self.size, self.steps, self.path_for(job_id))
+                try:
+                    future = self._get_executor().submit(*arguments)
+                except concurrent.futures.BrokenExecutor:
+                    # A crashed pool process breaks the whole pool; start a fresh one
+                    self._executor = None
+                    future = self._get_executor().submit(*arguments)
+                self._jobs[job_id] = future
+
+        # Registered outside the lock because an already finished future runs it immediately
+        if future is not None:
+            future.add_done_callback(lambda done: self._finish(job_id, done))
+        return self.status(job_id)
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            error = future.exception()
+            if error is not None:
+                self._failures[job_id] = str(error)
+                while len(self._failures) > 1024:
+                    self._failures.popitem(last=False)
+
+    def status(self, job_id):
+        """Report queued, running, done, failed or unknown for a job id"""
+        status = {'job_id': job_id, 'status': 'unknown'}
+        with self._lock:
+            future = self._jobs.get(job_id)
+            error = self._failures.get(job_id)
+
+        # The file is in place before a job's future completes, so check it after the lookup
+        if os.path.exists(self.path_for(job_id)):
+            status['status'] = 'done'
+        elif future is not None:
+            status['status'] = 'running' if future.running() else 'queued'
+        elif error is not None:
+            status['status'] = 'failed'
+            status['error'] = error
+        return status
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
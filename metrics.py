@@ -0,0 +1,189 @@
+"""
+Metrics - counters and latency histograms for the request hot path, exposed in
+the Prometheus text format.
+
+Every thread records into its own shard, so the hot path never takes a lock;
+shards are only summed when /metrics is scraped. A thread's shard is folded into
+a retired total when the thread exits, so short-lived threads don't pile up.
+Each gunicorn worker keeps its own registry, so series carry a `worker` label
+with the process id.
+"""
+
+import bisect
+import cProfile
+import itertools
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+# Upper bounds in seconds, tuned for a template chatbot that answers in well under 10ms
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class _ThreadToken:
+    """Kept in a thread's local storage, which is dropped when the thread exits"""
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = {}
+        self._shard_ids = itertools.count()
+        self._retired = ({}, {})
+        # Reentrant, since a finalizer may retire a shard while this thread holds the lock
+        self._shards_lock = threading.RLock()
+        self._descriptions = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        """Declare the Prometheus TYPE and HELP of a metric"""
+        self._descriptions[name] = (kind, help_text)
+
+    def register_collector(self, collector):
+        """Add a callable returning [(name, labels dict, value)] read at scrape time"""
+        self._collectors.append(collector)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = ({}, {})
+            shard_id = next(self._shard_ids)
+            with self._shards_lock:
+                self._shards[shard_id] = shard
+            self._local.token = _ThreadToken()
+            weakref.finalize(self._local.token, self._retire, shard_id)
+        return shard
+
+    def _retire(self, shard_id):
+        """Fold the shard of an exited thread into the retired totals"""
+        with self._shards_lock:
+            counters, histograms = self._shards.pop(shard_id)
+            self._add(self._retired, counters, histograms)
+
+    def _add(self, into, counters, histograms):
+        for key, value in list(counters.items()):
+            into[0][key] = into[0].get(key, 0) + value
+        for key, (buckets, total, count) in list(histograms.items()):
+            merged = into[1].setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+
+    def inc(self, name, value=1, **labels):
+        counters = self._shard()[0]
+        key = (name, _labels(labels))
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        histograms = self._shard()[1]
+        key = (name, _labels(labels))
+        histogram = histograms.get(key)
+        if histogram is None:
+            # Per-bucket counts (last one is +Inf), then sum and count
+            histogram = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _merged(self):
+        merged = ({}, {})
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            self._add(merged, *self._retired)
+        for shard_counters, shard_histograms in shards:
+            self._add(merged, shard_counters, shard_histograms)
+        return merged
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        worker = (('worker', os.getpid()),)
+        counters, histograms = self._merged()
+        series = {}
+        for (name, labels), value in counters.items():
+            series.setdefault(name, []).append(f"{name}{_format_labels(labels, worker)} {value}")
+        for (name, labels), (buckets, total, count) in histograms.items():
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), buckets):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels, worker + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels, worker)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels, worker)} {count}")
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                series.setdefault(name, []).append(f"{name}{_format_labels(_labels(labels), worker)} {value}")
+
+        output = []
+        for name in sorted(series):
+            if name in self._descriptions:
+                kind, help_text = self._descriptions[name]
+                output.append(f"# HELP {name} {help_text}")
+                output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n"
+
+
+class SlowRequestProfiler:
+    """Profiles a sample of requests and keeps the profile of those slower than a threshold"""
+
+    def __init__(self, sample_rate=0.0, threshold_ms=250, output_dir=os.path.join('.cache', 'profiles')):
+        self.sample_rate = sample_rate
+        self.threshold_ms = threshold_ms
+        self.output_dir = output_dir
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0
+
+    def start(self):
+        """Return a running profiler for a sampled request, or None"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profiler
+
+    def finish(self, profiler, duration_ms, label):
+        """Stop profiling and dump the stats if the request was slow; returns the dump path"""
+        if profiler is None:
+            return None
+        profiler.disable()
+        if duration_ms < self.threshold_ms:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = ''.join(char if char.isalnum() else '_' for char in label).strip('_') or 'request'
+        path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{int(duration_ms)}ms-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        return path
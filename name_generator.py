@@ -0,0 +1,51 @@
+"""
+Name Generator - treats every "<leading word> <keyword> <suffix>" combination as
+one index into a mixed-radix space and samples distinct indices in one call, so
+a request for N names returns exactly N unique names (up to the size of the space).
+"""
+
+import random
+
+
+class NameGenerator:
+    def __init__(self, prefixes, adjectives, suffixes):
+        # Professional prefixes and funny adjectives share the leading slot
+        self.leading = tuple(dict.fromkeys(list(prefixes) + list(adjectives)))
+        self.suffixes = tuple(dict.fromkeys(suffixes))
+
+    @staticmethod
+    def key_words(business_idea):
+        """Title-cased words of the idea, preferring those longer than 3 characters"""
+        words = business_idea.split()
+        key_words = [word.title() for word in words if len(word) > 3] or [word.title() for word in words]
+        return list(dict.fromkeys(key_words)) or ["Business"]
+
+    def space_size(self, business_idea):
+        """Number of distinct combinations available for an idea"""
+        return len(self.leading) * len(self.key_words(business_idea)) * len(self.suffixes)
+
+    def sample(self, business_idea, count, rng=None):
+        """Return up to count distinct combinations, drawn without replacement"""
+        rng = rng or random
+        key_words = self.key_words(business_idea)
+        leading, suffixes = self.leading, self.suffixes
+        per_leading = len(key_words) * len(suffixes)
+        total = len(leading) * per_leading
+
+        # sample() over a range draws distinct indices without building the range
+        indices = rng.sample(range(total), min(count, total))
+        names = []
+        for index in indices:
+            lead, rest = divmod(index, per_leading)
+            word, suffix = divmod(rest, len(suffixes))
+            names.append(f"{leading[lead]} {key_words[word]} {suffixes[suffix]}")
+        return names
+
+    def generate(self, business_idea, count=5, rng=None):
+        """Sampled combinations followed by the signature names built from the first keyword"""
+        names = self.sample(business_idea, count, rng)
+        key_word = self.key_words(business_idea)[0]
+        for name in (f"The {key_word} Collective", f"{key_word}ify" if len(key_word) > 4 else f"{key_word} & Co"):
+            if name not in names:
+                names.append(name)
+        return names
@@ -0,0 +1,45 @@
+"""
+Optional Dependencies - imports heavy libraries on first use of the feature that
+needs them, so the core chatbot starts with only Flask loaded.
+"""
+
+import importlib
+import importlib.util
+
+# Which requirements file provides each optional module
+EXTRAS = {
+    'openai': 'requirements-llm.txt',
+    'anthropic': 'requirements-llm.txt',
+    'google.generativeai': 'requirements-llm.txt',
+    'httpx': 'requirements-llm.txt',
+    'PIL': 'requirements-images.txt',
+    'torch': 'requirements-ml.txt',
+    'transformers': 'requirements-ml.txt',
+    'diffusers': 'requirements-ml.txt',
+    'accelerate': 'requirements-ml.txt',
+    'numpy': 'requirements-ml.txt',
+    'redis': 'requirements-redis.txt',
+    'orjson': 'requirements-speedups.txt',
+    'brotli': 'requirements-speedups.txt',
+    'uvicorn': 'requirements-asgi.txt',
+}
+
+
+class MissingDependencyError(ImportError):
+    pass
+
+
+def require(module_name, feature):
+    """Import an optional module, explaining which extra to install when it is missing"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as error:
+        requirements_file = EXTRAS.get(module_name) or EXTRAS.get(module_name.split('.')[0], 'requirements.txt')
+        raise MissingDependencyError(
+            f"{feature} needs '{module_name}'. Install it with: python3 -m pip install -r {requirements_file}"
+        ) from error
+
+
+def is_available(module_name):
+    """Return True if an optional module can be imported, without importing it"""
+    return importlib.util.find_spec(module_name.split('.')[0]) is not None
@@ -0,0 +1,147 @@
+"""
+Response Encoding - turns serialized JSON bodies into HTTP responses with strong
+ETags and gzip or brotli compression negotiated from Accept-Encoding.
+
+Static bodies (the welcome message and other fixed replies) are registered once
+and compressed ahead of time at the highest levels. Dynamic bodies above a size
+threshold are compressed at a fast level, and their compressed forms are cached
+by content hash, so a cached chat reply is also compressed only once.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+
+from flask.json.provider import DefaultJSONProvider
+
+from optional_deps import is_available, require
+from response_cache import ResponseCache
+
+
+def _digest(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} for an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class ResponseEncoder:
+    def __init__(self, min_size=512, gzip_level=6, brotli_quality=5, cache_size=1024):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # Brotli is optional; without it only gzip is offered
+        self.brotli = require('brotli', "Brotli compression") if is_available('brotli') else None
+        self.codings = ('br', 'gzip') if self.brotli is not None else ('gzip',)
+
+        self._static = {}
+        self._static_lock = threading.Lock()
+        self._compressed = ResponseCache(capacity=cache_size, ttl=0)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _compress(self, body, coding, best=False):
+        if coding == 'br':
+            return self.brotli.compress(body, quality=11 if best else self.brotli_quality)
+        return gzip.compress(body, compresslevel=9 if best else self.gzip_level, mtime=0)
+
+    def register_static(self, body):
+        """Precompute every compressed form of a body that never changes; returns its digest"""
+        digest = _digest(body)
+        variants = {None: body}
+        for coding in self.codings:
+            variants[coding] = self._compress(body, coding, best=True)
+        with self._static_lock:
+            self._static[digest] = variants
+        return digest
+
+    def negotiate(self, accept_encoding, size):
+        """Pick the content coding for a body of the given size, or None to send it as is"""
+        if size < self.min_size:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        for coding in self.codings:
+            quality = accepted.get(coding, accepted.get('*', 0.0))
+            if quality > 0:
+                return coding
+        return None
+
+    def encode(self, body, accept_encoding):
+        """Return (payload, coding, etag) for a body; each coding gets its own strong ETag"""
+        digest = _digest(body)
+        static = self._static.get(digest)
+        coding = self.negotiate(accept_encoding, len(body))
+        if coding is None:
+            return body, None, digest
+
+        if static is not None:
+            payload = static[coding]
+        else:
+            payload = self._compressed.get((digest, coding))
+            if payload is None:
+                payload = self._compress(body, coding)
+                self._compressed.set((digest, coding), payload)
+        # Keep compression only when it actually saves bytes
+        if len(payload) >= len(body):
+            return body, None, digest
+        self.bytes_in += len(body)
+        self.bytes_out += len(payload)
+        return payload, coding, f"{digest}-{coding}"
+
+    def response(self, app, request, body, status=200, mimetype=None):
+        """Build a response for a serialized body, answering If-None-Match with 304 on GET and HEAD"""
+        payload, coding, etag = self.encode(body, request.headers.get('Accept-Encoding'))
+        response = app.response_class(payload, status=status, mimetype=mimetype or app.json.mimetype)
+        response.vary.add('Accept-Encoding')
+        if coding is not None:
+            response.headers['Content-Encoding'] = coding
+        if status == 200:
+            response.set_etag(etag)
+            response.make_conditional(request)
+        return response
+
+    def stats(self):
+        return {
+            'codings': list(self.codings),
+            'min_size': self.min_size,
+            'static_bodies': len(self._static),
+            'bytes_before_compression': self.bytes_in,
+            'bytes_after_compression': self.bytes_out,
+            'compressed_cache': self._compressed.stats()
+        }
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, keeping the default provider's sorted keys"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.orjson = require('orjson', "The orjson JSON encoder")
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.orjson.dumps(obj, default=self.default, option=self.orjson.OPT_SORT_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return self.orjson.loads(s)
@@ -2,8 +2,16 @@
 """
 Small Business Chatbot - Startup Script
 This script helps you run both the Flask backend and React frontend
+
+Usage:
+    python3 run.py                      # install dependencies, start dev servers
+    python3 run.py serve --workers 4    # production backend under gunicorn
+    python3 run.py serve --server asgi  # the ASGI app under uvicorn, for many open connections
+    python3 run.py --import-report      # show what importing the backend loads
 """
 
+import argparse
+import gc
 import subprocess
 import sys
 import os
@@ -32,7 +40,151 @@ def run_frontend():
     except Exception as e:
         print(f"❌ Error running frontend: {e}")
 
+def serve_asgi(args):
+    """Run asgi_app under uvicorn; each worker drives every connection from one event loop"""
+    from optional_deps import MissingDependencyError, require
+    try:
+        uvicorn = require('uvicorn', "The ASGI server")
+    except MissingDependencyError as error:
+        print(f"❌ {error}")
+        sys.exit(1)
+
+    host, _, port = args.bind.rpartition(':')
+    # --threads sizes each worker's generator thread pool unless it is set explicitly
+    os.environ.setdefault('ASGI_EXECUTOR_THREADS', str(args.threads))
+    trusted_proxies = int(os.getenv('TRUSTED_PROXY_COUNT', '0'))
+
+    print(f"🚀 Serving ASGI backend on {args.bind} ({args.workers} workers, one event loop each)")
+    uvicorn.run(
+        'asgi_app:app',
+        host=host or '0.0.0.0',
+        port=int(port),
+        workers=args.workers,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keepalive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=bool(trusted_proxies),
+        forwarded_allow_ips='*' if trusted_proxies else None,
+        log_level='info'
+    )
+
+def serve(args):
+    """Run the backend under gunicorn with the app preloaded before workers fork"""
+    if args.server == 'asgi':
+        serve_asgi(args)
+        return
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ gunicorn is not installed. Run: python3 -m pip install -r requirements.txt")
+        sys.exit(1)
+
+    class BackendServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Importing app loads the template catalog once in the master
+            from app import app
+            return app
+
+    def when_ready(server):
+        # Move everything loaded so far out of the GC's reach so collections in the
+        # workers don't touch those pages and break copy-on-write sharing
+        gc.freeze()
+        server.log.info("Backend preloaded, forking %s workers x %s threads", args.workers, args.threads)
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': args.keepalive,
+        'backlog': args.backlog,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'preload_app': True,
+        'accesslog': '-',
+        'when_ready': when_ready
+    }
+
+    print(f"🚀 Serving backend on {args.bind} ({args.workers} workers x {args.threads} threads)")
+    BackendServer(options).run()
+
+def import_report(module='app', top=15):
+    """Import the backend in a fresh interpreter with -X importtime and summarize the cost per package"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        print(f"❌ Importing {module} failed")
+        sys.exit(1)
+
+    # Lines look like "import time:   self [us] | cumulative | <indent>package.module"
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        package = name.strip().split('.')[0]
+        self_times[package] = self_times.get(package, 0) + int(self_us)
+
+    total_us = sum(self_times.values())
+    print(f"📦 Importing '{module}' loaded {len(self_times)} top-level packages in {total_us / 1000:.1f}ms")
+    for package, self_us in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f}ms  {self_us / total_us:6.1%}  {package}")
+
+    heavy = ['openai', 'anthropic', 'google', 'httpx', 'PIL', 'torch', 'transformers', 'diffusers', 'accelerate', 'numpy', 'redis', 'orjson', 'brotli', 'uvicorn']
+    loaded = [package for package in heavy if package in self_times]
+    print(f"\n🪶 Optional packages loaded at startup: {', '.join(loaded) if loaded else 'none'}")
+
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        print(f"🧠 Peak RSS of the importing process: {peak_kb / 1024:.1f}MB")
+    except ImportError:
+        pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Small Business Chatbot launcher")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Print a per-package import time breakdown of the backend and exit")
+    subcommands = parser.add_subparsers(dest='command')
+
+    serve_parser = subcommands.add_parser('serve', help="Run the backend in production mode (no installs, no reloader)")
+    serve_parser.add_argument('--server', choices=('wsgi', 'asgi'), default=os.getenv('SERVER', 'wsgi'),
+                              help="wsgi: Flask app under gunicorn threads; asgi: asgi_app under uvicorn")
+    serve_parser.add_argument('--bind', default=os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}"))
+    serve_parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1)))
+    serve_parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', '4')))
+    serve_parser.add_argument('--timeout', type=int, default=30, help="Seconds before a silent worker is restarted")
+    serve_parser.add_argument('--graceful-timeout', type=int, default=30, help="Seconds to finish in-flight requests on shutdown")
+    serve_parser.add_argument('--keepalive', type=int, default=5)
+    serve_parser.add_argument('--backlog', type=int, default=2048, help="Pending connections the listening socket holds")
+    serve_parser.add_argument('--max-requests', type=int, default=0, help="Recycle workers after this many requests (0 disables)")
+
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    if args.import_report:
+        import_report()
+        return
+    if args.command == 'serve':
+        serve(args)
+        return
+
     print("🤖 Small Business Chatbot - Starting Up...")
     print("=" * 50)
     
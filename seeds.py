@@ -0,0 +1,46 @@
+"""
+Seeds - per-request random seeds. Randomized replies (names and ideas) are drawn
+from a random.Random built from the request's seed rather than the shared
+module-level RNG, so any reply can be regenerated, cached by (idea, seed) and
+replayed exactly, and concurrent requests never contend for one generator.
+"""
+
+import hashlib
+import random
+import secrets
+
+# Seeds are echoed to browsers, and JavaScript numbers hold 53 bits exactly
+SEED_BITS = 53
+# Larger seeds from clients are refused, since they could not be echoed back intact
+MAX_SEED = 2 ** SEED_BITS - 1
+
+
+def new_seed():
+    """A fresh seed for a request that did not send one"""
+    return secrets.randbits(SEED_BITS)
+
+
+def parse_seed(value):
+    """Return the seed a request sent (an integer or a string of digits), or None; raises ValueError"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("'seed' must be a non-negative integer")
+    try:
+        seed = int(value)
+    except ValueError:
+        raise ValueError("'seed' must be a non-negative integer") from None
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"'seed' must be between 0 and {MAX_SEED}")
+    return seed
+
+
+def derive_seed(seed, *parts):
+    """Seed for one part of a larger request, depending only on the parent seed and the part"""
+    digest = hashlib.sha256("\0".join(str(part) for part in (seed,) + parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') >> (64 - SEED_BITS)
+
+
+def rng_for(seed):
+    """A private generator for one seeded call"""
+    return random.Random(seed)
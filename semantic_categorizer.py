@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Semantic Categorizer - maps a business idea to a catalog category by comparing
+its sentence embedding with embeddings of each category's exemplar ideas.
+
+Most ideas never reach the model: an idea containing one of the exemplar
+phrases, or whole-word keywords of a single category, is answered immediately
+("barber shop" no longer matches "bar"), and earlier answers are kept in an LRU
+cache. The rest are queued to one inference thread per worker that embeds them
+in batches, compared against an exemplar index precomputed by
+`python3 semantic_categorizer.py build` and memory-mapped so every worker shares
+the same pages. Requests never wait on the model for longer than the configured
+timeout; until it has loaded, and whenever it is too slow, the keyword answer is
+used.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+from catalog import CatalogSource, DEFAULT_CATALOG_PATH
+from optional_deps import require
+from response_cache import ResponseCache, normalize_idea
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'category_index.npy')
+
+
+class EmbeddingModel:
+    """Mean-pooled, L2-normalized sentence embeddings from a local transformers model on CPU"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, max_length=64):
+        self.torch = require('torch', "Semantic categorization")
+        transformers = require('transformers', "Semantic categorization")
+        self.model_name = model_name
+        self.max_length = max_length
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+        self.model = transformers.AutoModel.from_pretrained(model_name).eval()
+
+    def encode(self, texts):
+        """Return a float32 array with one unit-length row per text"""
+        torch = self.torch
+        with torch.inference_mode():
+            batch = self.tokenizer(list(texts), padding=True, truncation=True,
+                                   max_length=self.max_length, return_tensors='pt')
+            hidden = self.model(**batch).last_hidden_state
+            mask = batch['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            return torch.nn.functional.normalize(pooled, dim=1).numpy().astype('float32')
+
+
+def _metadata_path(index_path):
+    return os.path.splitext(index_path)[0] + '.json'
+
+
+def build_index(catalog, model, index_path=DEFAULT_INDEX_PATH, batch_size=64):
+    """Embed every exemplar of the catalog and save the matrix with its labels"""
+    np = require('numpy', "Semantic categorization")
+    labels, texts = [], []
+    for category, exemplars in catalog.exemplars.items():
+        for text in exemplars:
+            labels.append(category)
+            texts.append(text)
+    if not texts:
+        raise ValueError("The catalog has no category exemplars to index")
+
+    vectors = np.concatenate([model.encode(texts[start:start + batch_size])
+                              for start in range(0, len(texts), batch_size)])
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    # Write then rename so workers never map a partial file
+    temporary_suffix = f".{os.getpid()}.tmp"
+    with open(index_path + temporary_suffix, 'wb') as index_file:
+        np.save(index_file, vectors)
+    os.replace(index_path + temporary_suffix, index_path)
+    metadata_path = _metadata_path(index_path)
+    with open(metadata_path + temporary_suffix, 'w', encoding='utf-8') as metadata_file:
+        json.dump({'model': model.model_name, 'revision': catalog.revision, 'labels': labels}, metadata_file)
+    os.replace(metadata_path + temporary_suffix, metadata_path)
+    return labels, vectors
+
+
+def load_index(index_path, model_name, revision):
+    """Memory-map a built index, or return None if it is missing or built for another model or catalog"""
+    np = require('numpy', "Semantic categorization")
+    try:
+        with open(_metadata_path(index_path), encoding='utf-8') as metadata_file:
+            metadata = json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+    if metadata.get('model') != model_name or metadata.get('revision') != revision:
+        return None
+    return tuple(metadata['labels']), np.load(index_path, mmap_mode='r')
+
+
+class SemanticCategorizer:
+    def __init__(self, catalog_source, model_name=DEFAULT_MODEL, index_path=DEFAULT_INDEX_PATH,
+                 cache_size=4096, batch_size=32, max_wait=0.005, timeout=0.25, min_score=0.35):
+        self.catalog_source = catalog_source
+        self.model_name = model_name
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.min_score = min_score
+        self.cache = ResponseCache(capacity=cache_size, ttl=0)
+
+        self.keyword_answers = 0
+        self.model_answers = 0
+        self.low_confidence = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.batches = 0
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+        self._patterns = (None, None, {}, ())
+        self._model = None
+        self._index = (None, None, None)
+        self._unavailable = False
+
+    def _compiled(self, catalog):
+        """Whole-word matchers for the catalog's exemplar phrases and category keywords"""
+        revision, exemplar_pattern, exemplar_categories, keyword_patterns = self._patterns
+        if revision != catalog.revision:
+            exemplar_categories = {
+                exemplar.lower(): category
+                for category, exemplars in catalog.exemplars.items() for exemplar in exemplars
+            }
+            exemplar_pattern = re.compile(r'(?=\b(' + '|'.join(map(re.escape, exemplar_categories)) + r')s?\b)') \
+                if exemplar_categories else None
+            keyword_patterns = tuple(
+                (category, re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')(?:s|es)?\b'))
+                for category, keywords in catalog.category_keywords
+            )
+            self._patterns = (catalog.revision, exemplar_pattern, exemplar_categories, keyword_patterns)
+        return exemplar_pattern, exemplar_categories, keyword_patterns
+
+    def _keyword_category(self, catalog, idea):
+        """Return (category or None when not decisive, best guess) from exemplar phrases and keywords"""
+        exemplar_pattern, exemplar_categories, keyword_patterns = self._compiled(catalog)
+        if exemplar_pattern is not None:
+            # The longest exemplar phrase in the idea is the most specific one
+            phrases = [match.group(1) for match in exemplar_pattern.finditer(idea)]
+            if phrases:
+                category = exemplar_categories[max(phrases, key=len)]
+                return category, category
+        matches = [category for category, pattern in keyword_patterns if pattern.search(idea)]
+        if len(matches) == 1:
+            return matches[0], matches[0]
+        return None, matches[0] if matches else catalog.default_category
+
+    def categorize(self, business_idea):
+        """Return the category of a business idea, consulting the model only when keywords are not decisive"""
+        return self.categorize_with_status(business_idea)[0]
+
+    def categorize_with_status(self, business_idea):
+        """Return (category, provisional); provisional is True when the model timed out or failed and
+        the keyword answer stood in, so a later call may answer differently"""
+        catalog = self.catalog_source.current()
+        idea = normalize_idea(business_idea.lower())
+        category, fallback = self._keyword_category(catalog, idea)
+        if category is not None:
+            self.keyword_answers += 1
+            return category, False
+        if self._unavailable or not idea:
+            return fallback, False
+
+        key = (catalog.revision, idea)
+        category = self.cache.get(key)
+        if category is not None:
+            return category, False
+
+        future = concurrent.futures.Future()
+        self._ensure_thread().put((idea, catalog, future))
+        try:
+            category = future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            # The answer still lands in the cache for the next request
+            self.timeouts += 1
+            return fallback, True
+        except Exception:
+            self.errors += 1
+            return fallback, True
+
+        if category is None:
+            self.low_confidence += 1
+            return fallback, False
+        self.model_answers += 1
+        return category, False
+
+    def _ensure_thread(self):
+        """Start the inference thread on first use, and again in each forked worker"""
+        with self._lock:
+            if self._queue is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, args=(self._queue,), name='semantic-categorizer', daemon=True).start()
+            return self._queue
+
+    def _run(self, requests):
+        while True:
+            batch = [requests.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                categories = self._classify_batch(batch)
+            except Exception as error:
+                if isinstance(error, ImportError):
+                    self._unavailable = True
+                logger.exception("Semantic categorization failed; using keyword categories")
+                for _, _, future in batch:
+                    future.set_exception(error)
+                continue
+
+            for (idea, catalog, future), category in zip(batch, categories):
+                self.cache.set((catalog.revision, idea), category or self._keyword_category(catalog, idea)[1])
+                future.set_result(category)
+
+    def _classify_batch(self, batch):
+        np = require('numpy', "Semantic categorization")
+        if self._model is None:
+            self._model = EmbeddingModel(self.model_name)
+        self.batches += 1
+
+        # A batch can straddle a catalog reload, so group it by revision
+        categories = [None] * len(batch)
+        by_revision = {}
+        for position, (idea, catalog, _) in enumerate(batch):
+            by_revision.setdefault(catalog.revision, (catalog, []))[1].append(position)
+
+        for revision, (catalog, positions) in by_revision.items():
+            labels, vectors = self._index_for(catalog)
+            embeddings = self._model.encode([batch[position][0] for position in positions])
+            scores = embeddings @ np.asarray(vectors).T
+            for row, position in enumerate(positions):
+                # The best exemplar of each category decides its score
+                best = {}
+                for label, score in zip(labels, scores[row]):
+                    if score > best.get(label, -1.0):
+                        best[label] = score
+                category, score = max(best.items(), key=lambda item: item[1])
+                categories[position] = category if score >= self.min_score else None
+        return categories
+
+    def _index_for(self, catalog):
+        revision, labels, vectors = self._index
+        if revision == catalog.revision:
+            return labels, vectors
+        index = load_index(self.index_path, self.model_name, catalog.revision)
+        if index is None:
+            logger.warning("No category index for catalog %s at %s; embedding exemplars in memory "
+                           "(run `python3 semantic_categorizer.py build` to precompute it)",
+                           catalog.revision, self.index_path)
+            index = build_index(catalog, self._model, self.index_path)
+        self._index = (catalog.revision,) + tuple(index)
+        return index
+
+    def stats(self):
+        return {
+            'model': self.model_name,
+            'available': not self._unavailable,
+            'keyword_answers': self.keyword_answers,
+            'model_answers': self.model_answers,
+            'low_confidence': self.low_confidence,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'batches': self.batches,
+            'cache': self.cache.stats()
+        }
+
+
+def categorizer_from_env(catalog_source):
+    """Build the semantic categorizer when SEMANTIC_CATEGORIZER is enabled, else None"""
+    if os.getenv('SEMANTIC_CATEGORIZER', '').lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    return SemanticCategorizer(
+        catalog_source,
+        model_name=os.getenv('CATEGORY_MODEL', DEFAULT_MODEL),
+        index_path=os.getenv('CATEGORY_INDEX_PATH', DEFAULT_INDEX_PATH),
+        cache_size=int(os.getenv('CATEGORY_CACHE_SIZE', '4096')),
+        batch_size=int(os.getenv('CATEGORY_BATCH_SIZE', '32')),
+        timeout=float(os.getenv('CATEGORY_TIMEOUT', '0.25')),
+        min_score=float(os.getenv('CATEGORY_MIN_SCORE', '0.35'))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the semantic category index")
+    parser.add_argument('--catalog', default=os.getenv('CATALOG_PATH', DEFAULT_CATALOG_PATH))
+    parser.add_argument('--model', default=os.getenv('CATEGORY_MODEL', DEFAULT_MODEL))
+    parser.add_argument('--index', default=os.getenv('CATEGORY_INDEX_PATH', DEFAULT_INDEX_PATH))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help="Embed the catalog exemplars and write the index")
+    classify = subparsers.add_parser('classify', help="Categorize ideas given on the command line")
+    classify.add_argument('ideas', nargs='+')
+    args = parser.parse_args()
+
+    catalog_source = CatalogSource(args.catalog, check_interval=0)
+    if args.command == 'build':
+        start = time.perf_counter()
+        labels, _ = build_index(catalog_source.current(), EmbeddingModel(args.model), args.index)
+        print(f"✅ Indexed {len(labels)} exemplars for catalog {catalog_source.current().revision} "
+              f"in {time.perf_counter() - start:.1f}s → {args.index}")
+        return
+
+    # Wait for the model here; requests use a short timeout instead
+    categorizer = SemanticCategorizer(catalog_source, model_name=args.model, index_path=args.index, timeout=120)
+    for idea in args.ideas:
+        print(f"🏷️  {idea} → {categorizer.categorize(idea)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Session Store - remembers each conversation's business idea, category, chosen
+name and generated responses, so follow-up messages reuse earlier work instead
+of resending context and recomputing it.
+
+The in-process store bounds memory with a session limit, idle eviction and a
+per-session artifact limit. With several workers, the Redis store (or any
+server speaking the Redis protocol) shares sessions between them.
+"""
+
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from optional_deps import require
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def new_session_id():
+    return secrets.token_urlsafe(16)
+
+
+def is_valid_session_id(session_id):
+    return isinstance(session_id, str) and SESSION_ID_PATTERN.match(session_id) is not None
+
+
+def new_session():
+    # category_provisional marks a keyword category used while the model was too slow to answer
+    return {'idea': '', 'category': None, 'category_provisional': False, 'name': None, 'artifacts': {}}
+
+
+class SessionStore:
+    def __init__(self, idle_ttl=1800, max_artifacts=16):
+        self.idle_ttl = idle_ttl
+        self.max_artifacts = max_artifacts
+
+    def remember(self, session, key, body):
+        """Keep a serialized response (bytes) in the session, dropping its oldest ones past the limit"""
+        artifacts = session['artifacts']
+        artifacts.pop(key, None)
+        artifacts[key] = self._pack(body)
+        while len(artifacts) > self.max_artifacts:
+            del artifacts[next(iter(artifacts))]
+
+    def recall(self, session, key):
+        """Return a response remembered in the session (bytes), or None"""
+        body = session['artifacts'].get(key)
+        return self._unpack(body) if body is not None else None
+
+    def _pack(self, body):
+        return body
+
+    def _unpack(self, body):
+        return body
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in this process; remembered responses are the response cache's own bytes, not copies"""
+
+    def __init__(self, max_sessions=10000, idle_ttl=1800, max_artifacts=16):
+        super().__init__(idle_ttl, max_artifacts)
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id):
+        """Return a copy of the session, or None if it is unknown or has been idle too long"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            session, last_seen = entry
+            if self.idle_ttl and last_seen + self.idle_ttl < time.monotonic():
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            return {**session, 'artifacts': dict(session['artifacts'])}
+
+    def save(self, session_id, session):
+        """Store the session, evicting the least recently active ones when full"""
+        with self._lock:
+            self._sessions[session_id] = (session, time.monotonic())
+            self._sessions.move_to_end(session_id)
+            self._expire()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def _expire(self):
+        # Sessions are ordered by last activity, so idle ones are at the front
+        deadline = time.monotonic() - self.idle_ttl if self.idle_ttl else None
+        while deadline is not None and self._sessions:
+            _, last_seen = next(iter(self._sessions.values()))
+            if last_seen >= deadline:
+                break
+            self._sessions.popitem(last=False)
+            self.expirations += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'max_sessions': self.max_sessions,
+                'idle_ttl': self.idle_ttl,
+                'max_artifacts': self.max_artifacts,
+                'sessions': len(self._sessions),
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions shared by every worker; Redis expires them after idle_ttl without activity"""
+
+    def __init__(self, url, idle_ttl=1800, max_artifacts=16, prefix='chatbot:session:'):
+        super().__init__(idle_ttl, max_artifacts)
+        redis = require('redis', "The Redis session store")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _pack(self, body):
+        # Sessions are stored as JSON
+        return body.decode('utf-8')
+
+    def _unpack(self, body):
+        return body.encode('utf-8')
+
+    def get(self, session_id):
+        raw = self.client.get(self.prefix + session_id)
+        return json.loads(raw) if raw is not None else None
+
+    def save(self, session_id, session):
+        self.client.set(self.prefix + session_id, json.dumps(session), ex=int(self.idle_ttl) or None)
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+    def stats(self):
+        return {
+            'backend': 'redis',
+            'idle_ttl': self.idle_ttl,
+            'max_artifacts': self.max_artifacts
+        }
+
+
+def session_store_from_env():
+    """Build the store selected by SESSION_BACKEND (memory or redis)"""
+    name = os.getenv('SESSION_BACKEND', 'memory').lower()
+    idle_ttl = float(os.getenv('SESSION_IDLE_TTL', '1800'))
+    max_artifacts = int(os.getenv('SESSION_MAX_ARTIFACTS', '16'))
+
+    if name == 'memory':
+        return MemorySessionStore(
+            max_sessions=int(os.getenv('SESSION_MAX_SESSIONS', '10000')),
+            idle_ttl=idle_ttl,
+            max_artifacts=max_artifacts
+        )
+    if name == 'redis':
+        return RedisSessionStore(os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                                 idle_ttl=idle_ttl, max_artifacts=max_artifacts)
+    raise ValueError(f"Unknown SESSION_BACKEND '{name}' (expected memory or redis)")
@@ -1,7 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import styled, { createGlobalStyle } from 'styled-components';
 import { motion, AnimatePresence } from 'framer-motion';
-import { Send, Bot, User, Lightbulb, Target, Palette, Share2, Sparkles } from 'lucide-react';
+import { Send, Bot, User, Lightbulb, Target, Palette, Share2, Sparkles, Rocket } from 'lucide-react';
 import axios from 'axios';
 
 const GlobalStyle = createGlobalStyle`
@@ -236,6 +236,18 @@ const SendButton = styled.button`
   }
 `;
 
+const RenderLogoButton = styled(SendButton)`
+  margin-top: 0.5rem;
+`;
+
+const LogoImage = styled.img`
+  width: 256px;
+  max-width: 100%;
+  border-radius: 12px;
+  margin: 1rem 0;
+  box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
+`;
+
 const QuickActions = styled.div`
   display: flex;
   flex-wrap: wrap;
@@ -264,6 +276,28 @@ const QuickActionButton = styled.button`
   }
 `;
 
+// Answered together through /api/chat/batch so the idea is only sent and categorized once
+const STARTER_KIT_MESSAGES = [
+  'Give me the steps to start my business',
+  'Suggest names for my business',
+  'Create a logo',
+  'Create a LinkedIn post',
+  'Give me innovative ideas'
+];
+
+// Response types whose items arrive as separate events on /api/chat/stream
+const STREAMED_LIST_TYPES = ['steps', 'names', 'ideas'];
+
+const parseStreamEvent = (chunk) => {
+  let event = 'message';
+  let data = '';
+  chunk.split('\n').forEach(line => {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    else if (line.startsWith('data: ')) data += line.slice(6);
+  });
+  return { event, payload: data ? JSON.parse(data) : null };
+};
+
 function App() {
   const [messages, setMessages] = useState([]);
   const [inputMessage, setInputMessage] = useState('');
@@ -271,6 +305,8 @@ function App() {
   const [businessName, setBusinessName] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const messagesEndRef = useRef(null);
+  // The server remembers the idea, name and earlier answers under this id
+  const sessionIdRef = useRef(null);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -280,6 +316,31 @@ function App() {
     scrollToBottom();
   }, [messages]);
 
+  const updateMessage = (id, update) => {
+    setMessages(prev => prev.map(m => (m.id === id ? { ...m, ...update(m) } : m)));
+  };
+
+  // The header arrives first and becomes the bot message; steps, names and ideas
+  // are appended one event at a time as the server generates them
+  const applyStreamEvent = (botId, { event, payload }) => {
+    if (event === 'message') {
+      const botMessage = {
+        id: botId,
+        text: payload.message,
+        isUser: false,
+        timestamp: new Date(),
+        type: payload.type,
+        data: STREAMED_LIST_TYPES.includes(payload.type) ? [] : null
+      };
+      setMessages(prev => [...prev, botMessage]);
+      setIsLoading(false);
+    } else if (event === 'item') {
+      updateMessage(botId, m => ({ data: [...(m.data || []), payload] }));
+    } else if (event === 'data') {
+      updateMessage(botId, () => ({ data: payload }));
+    }
+  };
+
   const sendMessage = async (message = inputMessage) => {
     if (!message.trim() && !businessIdea.trim()) return;
 
@@ -294,25 +355,89 @@ function App() {
     setInputMessage('');
     setIsLoading(true);
 
+    const botId = Date.now() + 1;
+
+    try {
+      const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          message: message,
+          business_idea: businessIdea,
+          business_name: businessName,
+          session_id: sessionIdRef.current,
+          session: true
+        })
+      });
+      sessionIdRef.current = response.headers.get('X-Session-Id') || sessionIdRef.current;
+
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat stream failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          applyStreamEvent(botId, parseStreamEvent(buffer.slice(0, boundary)));
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+        }
+      }
+    } catch (error) {
+      console.error('Error sending message:', error);
+      const errorMessage = {
+        id: botId,
+        text: 'Sorry, I encountered an error. Please try again.',
+        isUser: false,
+        timestamp: new Date()
+      };
+      setMessages(prev => [...prev.filter(m => m.id !== botId), errorMessage]);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const sendStarterKit = async () => {
+    const userMessage = {
+      id: Date.now(),
+      text: 'Build my starter kit',
+      isUser: true,
+      timestamp: new Date()
+    };
+
+    setMessages(prev => [...prev, userMessage]);
+    setIsLoading(true);
+
     try {
-      const response = await axios.post('/api/chat', {
-        message: message,
+      const response = await axios.post('/api/chat/batch', {
+        messages: STARTER_KIT_MESSAGES,
         business_idea: businessIdea,
-        business_name: businessName
+        business_name: businessName,
+        session_id: sessionIdRef.current,
+        session: true
       });
+      sessionIdRef.current = response.headers['x-session-id'] || sessionIdRef.current;
 
-      const botMessage = {
-        id: Date.now() + 1,
-        text: response.data.message,
+      const botMessages = response.data.map((result, index) => ({
+        id: Date.now() + index + 1,
+        text: result.message,
         isUser: false,
         timestamp: new Date(),
-        type: response.data.type,
-        data: response.data.data
-      };
+        type: result.type,
+        data: result.data
+      }));
 
-      setMessages(prev => [...prev, botMessage]);
+      setMessages(prev => [...prev, ...botMessages]);
     } catch (error) {
-      console.error('Error sending message:', error);
+      console.error('Error sending starter kit:', error);
       const errorMessage = {
         id: Date.now() + 1,
         text: 'Sorry, I encountered an error. Please try again.',
@@ -325,6 +450,29 @@ function App() {
     }
   };
 
+  const renderLogo = async (message) => {
+    // A render that failed before is only attempted again when asked to
+    const retry = message.logoStatus === 'failed';
+    updateMessage(message.id, () => ({ logoStatus: 'rendering' }));
+
+    try {
+      // Renders run in a background pool; poll the job until it finishes
+      let response = await axios.post('/api/logo/render', { prompt: message.data, retry });
+      while (response.status === 202) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        response = await axios.get(`/api/logo/jobs/${response.data.job_id}`);
+      }
+
+      if (response.data.status !== 'done') {
+        throw new Error(response.data.error || 'Logo rendering failed');
+      }
+      updateMessage(message.id, () => ({ logoStatus: 'done', logoUrl: response.data.image_url }));
+    } catch (error) {
+      console.error('Error rendering logo:', error);
+      updateMessage(message.id, () => ({ logoStatus: 'failed' }));
+    }
+  };
+
   const handleQuickAction = (action) => {
     sendMessage(action);
   };
@@ -368,6 +516,14 @@ function App() {
         <>
           <div>{message.text}</div>
           <LogoPrompt>{message.data}</LogoPrompt>
+          {message.logoUrl ? (
+            <LogoImage src={message.logoUrl} alt="Rendered logo preview" />
+          ) : (
+            <RenderLogoButton onClick={() => renderLogo(message)} disabled={message.logoStatus === 'rendering'}>
+              <Palette size={16} />
+              {message.logoStatus === 'rendering' ? 'Rendering...' : message.logoStatus === 'failed' ? 'Retry preview' : 'Render preview'}
+            </RenderLogoButton>
+          )}
         </>
       );
     }
@@ -471,6 +627,10 @@ function App() {
                 <Palette size={16} />
                 Logo Design
               </QuickActionButton>
+              <QuickActionButton onClick={sendStarterKit}>
+                <Rocket size={16} />
+                Starter Kit
+              </QuickActionButton>
             </QuickActions>
           )}
 
@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+import bulk_generate
+
+SCRIPT = os.path.abspath(bulk_generate.__file__)
+
+
+def run(input_path, output_path, *extra):
+    subprocess.run([sys.executable, SCRIPT, str(input_path), str(output_path), '--workers', '1',
+                    '--chunk-size', '3', '--generate', 'names,ideas', *extra],
+                   check=True, capture_output=True)
+
+
+def test_resume_after_interruption_matches_a_full_run(tmp_path):
+    input_path = tmp_path / 'ideas.jsonl'
+    ideas = ['"coffee shop"', '"bakery"', '{"business_idea": "dog walking", "seed": 7}', '"bike repair"',
+             '{not json', '"online tutoring"', '"food truck"', '"yoga studio"']
+    input_path.write_text("".join(idea + "\n" for idea in ideas))
+    full_path = tmp_path / 'full.jsonl'
+    run(input_path, full_path)
+    expected = full_path.read_bytes()
+    lines = expected.splitlines(keepends=True)
+    assert len(lines) == len(ideas)
+    assert json.loads(lines[4])['id'] == 4 and 'error' in json.loads(lines[4])
+
+    # Stop after three rows, with half a chunk written past the checkpoint
+    resumed_path = tmp_path / 'resumed.jsonl'
+    run(input_path, resumed_path)
+    checkpoint_path = tmp_path / 'resumed.jsonl.checkpoint'
+    state = json.loads(checkpoint_path.read_text())
+    committed = b''.join(lines[:3])
+    state.update(rows_read=3, rows_written=3, output_bytes=len(committed))
+    checkpoint_path.write_text(json.dumps(state))
+    resumed_path.write_bytes(committed + lines[3][:10])
+
+    run(input_path, resumed_path, '--resume')
+    assert resumed_path.read_bytes() == expected
+    assert json.loads(checkpoint_path.read_text())['rows_written'] == len(ideas)
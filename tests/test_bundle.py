@@ -0,0 +1,56 @@
+import pytest
+
+from bundle import BundleError, StaticBundle, reply_path, reply_paths, write_bundle
+
+
+def test_write_and_find_round_trip(tmp_path):
+    path = str(tmp_path / 'replies.bundle')
+    items = {f"key-{index:03d}".encode('utf-8'): f"value {index}".encode('utf-8') * index for index in range(50)}
+    items[b''] = b'empty key'
+    items[b'\xff\xfe'] = b''
+    write_bundle(path, items, {'revision': 'r1', 'seeds': [1, 2]})
+
+    bundle = StaticBundle(path)
+    assert bundle.count == len(items)
+    assert bundle.revision == 'r1'
+    assert bundle.seeds == (1, 2)
+    assert list(bundle.keys()) == sorted(items)
+    for key, value in items.items():
+        assert bundle.get(key) == value
+    for missing in (b'a', b'key-000a', b'key-05', b'zzz', b'\xff\xff'):
+        assert missing not in bundle
+        assert bundle.get(missing) is None
+    assert bundle.hits == len(items) and bundle.misses == 5
+
+
+def test_empty_bundle(tmp_path):
+    path = str(tmp_path / 'empty.bundle')
+    write_bundle(path, {}, {})
+    bundle = StaticBundle(path)
+    assert bundle.count == 0
+    assert bundle.get(b'anything') is None
+
+
+def test_rejects_truncated_and_foreign_files(tmp_path):
+    path = tmp_path / 'replies.bundle'
+    write_bundle(str(path), {b'key': b'value'}, {})
+    path.write_bytes(path.read_bytes()[:20])
+    with pytest.raises(BundleError):
+        StaticBundle(str(path))
+    path.write_bytes(b'not a bundle at all, just some bytes')
+    with pytest.raises(BundleError):
+        StaticBundle(str(path))
+
+
+def test_reply_paths_keep_readable_names_and_split_collisions():
+    plain = ('steps', 'r1', 'coffee shop')
+    first = ('social_media', 'r1', 'coffee shop', 'Bean There!', 'linkedin')
+    second = ('social_media', 'r1', 'coffee shop', 'bean there', 'linkedin')
+    paths = reply_paths([plain, first, second])
+
+    assert paths[plain] == reply_path(plain) == 'coffee-shop/steps.json'
+    assert paths[first] != paths[second]
+    assert len(set(paths.values())) == 3
+    assert paths[first].startswith('coffee-shop/social_media-bean-there-linkedin-')
+    # The hash depends only on the key, so an export writes the same paths every time
+    assert reply_paths([second, first]) == {first: paths[first], second: paths[second]}